@@ -1,30 +1,22 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-from matplotlib.patches import Circle, RegularPolygon
-from matplotlib.path import Path
-from matplotlib.projections.polar import PolarAxes
-from matplotlib.projections import register_projection
-from matplotlib.spines import Spine
-from matplotlib.transforms import Affine2D
-import numpy as np
-import json
-import sqlite3
-import uuid
-from datetime import datetime, timedelta
-import os
-from pathlib import Path as PathLib
+import orjson
+import time
+from datetime import datetime
+
+# matplotlib and pandas are imported lazily inside the blocks that render
+# charts/tables - pulling them in at module top costs hundreds of ms and
+# tens of MB on cold start even for sessions that never view them
 
 # Import our modules
-from src.db import init_db, get_db_connection, seed_database
+from src.db import init_db, seed_database
 from src.budget import BudgetManager
 from src.quests import QuestManager
 from src.board import BoardManager
-from src.sim import SimManager
-from src.autonomy import AutonomyIndex
+from src.sim import sim_manager
+from src.autonomy import AutonomyIndex, render_radar_png
 from src.indiegraph import IndieGraph
 from src.utils import export_data, import_data, generate_id
+from src.dashboard import get_dashboard_snapshot
 
 # Page config
 st.set_page_config(
@@ -86,7 +78,7 @@ def initialize_app():
         'budget': BudgetManager(),
         'quests': QuestManager(),
         'board': BoardManager(),
-        'sim': SimManager(),
+        'sim': sim_manager,
         'autonomy': AutonomyIndex(),
         'indiegraph': IndieGraph()
     }
@@ -94,6 +86,94 @@ def initialize_app():
 # Initialize app
 managers = initialize_app()
 
+# Cached read paths - Streamlit reruns the whole script on every widget
+# interaction, so without these every click re-runs ~10 SELECTs against SQLite.
+# cache_data is global across sessions, so user_id stays in the key signature.
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_budget_overview(user_id):
+    return managers['budget'].get_budget_overview(user_id)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_recent_txn_cols(user_id, limit=10):
+    return managers['budget'].get_recent_transactions_columns(user_id, limit=limit)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_streak(user_id):
+    return managers['budget'].get_current_streak(user_id)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_badges(user_id):
+    return managers['budget'].get_user_badges(user_id)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_quests(difficulty=None):
+    return managers['quests'].get_quests(difficulty)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_quest_progress(user_id):
+    return managers['quests'].get_progress_summary(user_id)
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_completed_quest_ids(user_id):
+    return managers['quests'].get_completed_quest_ids(user_id)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_posts(kind=None):
+    return managers['board'].get_posts(kind)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_my_posts(user_id):
+    return managers['board'].get_my_posts(user_id)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_scenarios():
+    return managers['sim'].get_available_scenarios()
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_dashboard(user_id):
+    # One connection, one transaction for everything the Dashboard renders
+    return get_dashboard_snapshot(user_id, indiegraph=managers['indiegraph'])
+
+def _clear_budget_caches():
+    """Invalidate budget-derived caches after a write"""
+    _cached_budget_overview.clear()
+    _cached_recent_txn_cols.clear()
+    _cached_streak.clear()
+    _cached_badges.clear()
+    _cached_dashboard.clear()
+    _cached_radar_png.clear()
+    # The shared manager's own memo too: writes that bypass its methods
+    # (like data import) would otherwise leave it stale forever
+    managers['budget'].reset_cache()
+    managers['autonomy'].reset_cache()
+
+def _clear_quest_caches():
+    """Invalidate quest-derived caches after a write"""
+    _cached_quest_progress.clear()
+    _cached_completed_quest_ids.clear()
+    _cached_dashboard.clear()
+    _cached_radar_png.clear()
+    managers['autonomy'].reset_cache()
+
+def _clear_board_caches():
+    """Invalidate board-derived caches after a write"""
+    _cached_posts.clear()
+    _cached_my_posts.clear()
+    _cached_dashboard.clear()
+    _cached_radar_png.clear()
+    managers['autonomy'].reset_cache()
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_radar_png(radar_values):
+    """Render the radar chart once and cache the PNG bytes.
+
+    Rebuilding a polar matplotlib Figure on every rerun costs 50-200ms of
+    pure CPU. render_radar_png memoizes the rendered bytes by the plotted
+    values (Agg backend, figure closed after save); st.cache_data on top
+    keeps the per-session hot path from re-entering the module at all.
+    """
+    return render_radar_png(radar_values)
+
 # Main app header
 st.markdown('<h1 class="main-header">🚀 IndiePilot</h1>', unsafe_allow_html=True)
 st.markdown('<p style="text-align: center; font-size: 1.2rem; color: #666;">Your offline, privacy-first independence copilot</p>', unsafe_allow_html=True)
@@ -104,11 +184,13 @@ tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
 ])
 
 # Dashboard Tab
-with tab1:
+@st.fragment
+def dashboard_tab():
     st.header("🏠 Your Independence Dashboard")
     
-    # Get current user data
-    autonomy_score = managers['autonomy'].compute_autonomy_index(st.session_state.user_id)
+    # Get current user data - one snapshot call covers the whole tab
+    dashboard = _cached_dashboard(st.session_state.user_id)
+    autonomy_score = dashboard['score']
     
     # Welcome section
     col1, col2 = st.columns([2, 1])
@@ -117,7 +199,7 @@ with tab1:
         st.subheader(f"Welcome back, {st.session_state.user_name}! 👋")
         
         # Get today's streak
-        streak = managers['budget'].get_current_streak(st.session_state.user_id)
+        streak = dashboard['streak']
         if streak > 0:
             st.markdown(f'<div class="streak-badge">🔥 {streak} day streak!</div>', unsafe_allow_html=True)
         else:
@@ -128,12 +210,11 @@ with tab1:
     
     # Autonomy Radar Chart
     st.subheader("🎯 Your Independence Radar")
-    radar_fig = managers['autonomy'].plot_radar(st.session_state.user_id)
-    st.pyplot(radar_fig)
+    st.image(_cached_radar_png(dashboard['radar_values']))
     
     # IndieGraph Recommendations
     st.subheader("🧠 IndieGraph™ - Skill Dependencies")
-    recommendations = managers['indiegraph'].get_next_skills(st.session_state.user_id)
+    recommendations = dashboard['recommendations']
     
     if recommendations:
         st.write("**Recommended next skills to unlock:**")
@@ -159,11 +240,12 @@ with tab1:
             st.switch_page("🎯 IndieSim")
 
 # Budget Tab
-with tab2:
+@st.fragment
+def budget_tab():
     st.header("💸 Three-Jar Budget System")
     
     # Budget overview
-    budget_data = managers['budget'].get_budget_overview(st.session_state.user_id)
+    budget_data = _cached_budget_overview(st.session_state.user_id)
     
     col1, col2, col3 = st.columns(3)
     
@@ -199,8 +281,9 @@ with tab2:
         
         if st.form_submit_button("Add Income"):
             managers['budget'].add_income(st.session_state.user_id, income_amount, income_note)
+            _clear_budget_caches()
             st.success(f"Added ${income_amount:.2f} to your budget!")
-            st.rerun()
+            st.rerun(scope="fragment")
     
     # Add expense
     st.subheader("💸 Log an Expense")
@@ -211,25 +294,41 @@ with tab2:
         
         if st.form_submit_button("Log Expense"):
             managers['budget'].add_expense(st.session_state.user_id, expense_amount, expense_jar, expense_note)
+            _clear_budget_caches()
             st.success(f"Logged ${expense_amount:.2f} expense!")
-            st.rerun()
+            st.rerun(scope="fragment")
     
     # Recent transactions
     st.subheader("📊 Recent Transactions")
-    transactions = managers['budget'].get_recent_transactions(st.session_state.user_id, limit=10)
+    txn_cols = _cached_recent_txn_cols(st.session_state.user_id, limit=10)
     
-    if transactions:
-        df = pd.DataFrame(transactions)
-        df['amount'] = df['amount'].apply(lambda x: f"${x:.2f}")
-        df['ts'] = pd.to_datetime(df['ts']).dt.strftime('%Y-%m-%d %H:%M')
-        st.dataframe(df[['ts', 'amount', 'jar', 'note']], hide_index=True)
+    if txn_cols['ts']:
+        import numpy as np
+        import pandas as pd
+
+        # Columnar construction with explicit dtypes - no inference pass,
+        # no column rewrites; formatting happens Arrow-side in the browser
+        df = pd.DataFrame({
+            'ts': pd.to_datetime(txn_cols['ts']),
+            'amount': np.asarray(txn_cols['amount'], dtype=np.float64),
+            'jar': pd.Categorical(txn_cols['jar'], categories=['spend', 'save', 'share']),
+            'note': txn_cols['note']
+        })
+        st.dataframe(
+            df,
+            column_config={
+                'ts': st.column_config.DatetimeColumn(format="YYYY-MM-DD HH:mm"),
+                'amount': st.column_config.NumberColumn(format="$%.2f")
+            },
+            hide_index=True
+        )
     else:
         st.write("No transactions yet. Start by adding some income!")
     
     # Streaks and badges
     st.subheader("🏆 Your Achievements")
-    streak = managers['budget'].get_current_streak(st.session_state.user_id)
-    badges = managers['budget'].get_user_badges(st.session_state.user_id)
+    streak = _cached_streak(st.session_state.user_id)
+    badges = _cached_badges(st.session_state.user_id)
     
     col1, col2 = st.columns(2)
     
@@ -245,19 +344,19 @@ with tab2:
             st.write("Complete 7 days of logging to earn your first badge!")
 
 # Quests Tab
-with tab3:
+@st.fragment
+def quests_tab():
     st.header("🧭 Life Skills Quests")
     
-    # Quest categories
-    quests = managers['quests'].get_all_quests()
-    
-    # Filter by difficulty
+    # Filter by difficulty - pushed down to SQL so only matching rows
+    # are materialized
     difficulty_filter = st.selectbox("Filter by difficulty:", ["All", "Beginner", "Intermediate", "Advanced"])
+    difficulty_map = {"Beginner": 1, "Intermediate": 2, "Advanced": 3}
+    quests = _cached_quests(difficulty_map.get(difficulty_filter))
     
-    if difficulty_filter != "All":
-        difficulty_map = {"Beginner": 1, "Intermediate": 2, "Advanced": 3}
-        quests = [q for q in quests if q['difficulty'] == difficulty_map[difficulty_filter]]
-    
+    # One query for completion status instead of one per quest in the loop
+    completed_ids = _cached_completed_quest_ids(st.session_state.user_id)
+
     # Display quests
     for quest in quests:
         with st.expander(f"🎯 {quest['title']} (XP: {quest['xp']})"):
@@ -274,7 +373,7 @@ with tab3:
             
             with col2:
                 # Check if completed
-                is_completed = managers['quests'].is_quest_completed(st.session_state.user_id, quest['id'])
+                is_completed = quest['id'] in completed_ids
                 
                 if is_completed:
                     st.success("✅ Completed!")
@@ -282,33 +381,34 @@ with tab3:
                     if st.button(f"Start Quest", key=f"start_{quest['id']}"):
                         managers['quests'].start_quest(st.session_state.user_id, quest['id'])
                         st.success("Quest started! Complete it when you're ready.")
-                        st.rerun()
+                        st.rerun(scope="fragment")
                     
                     if st.button(f"Complete Quest", key=f"complete_{quest['id']}"):
                         managers['quests'].complete_quest(st.session_state.user_id, quest['id'])
+                        _clear_quest_caches()
                         st.success(f"🎉 Quest completed! You earned {quest['xp']} XP!")
-                        st.rerun()
+                        st.rerun(scope="fragment")
     
-    # Quest progress
+    # Quest progress - scalars come straight from SQL
     st.subheader("📈 Your Progress")
-    completed_quests = managers['quests'].get_completed_quests(st.session_state.user_id)
-    total_xp = sum(q['xp'] for q in completed_quests)
+    progress = _cached_quest_progress(st.session_state.user_id)
     
     col1, col2 = st.columns(2)
     
     with col1:
-        st.metric("Quests Completed", len(completed_quests))
+        st.metric("Quests Completed", progress['completed_count'])
     
     with col2:
-        st.metric("Total XP Earned", total_xp)
+        st.metric("Total XP Earned", progress['total_xp'])
     
-    if completed_quests:
+    if progress['recent']:
         st.write("**Recently completed:**")
-        for quest in completed_quests[-3:]:
+        for quest in progress['recent']:
             st.write(f"✅ {quest['title']} (+{quest['xp']} XP)")
 
 # Youth Board Tab
-with tab4:
+@st.fragment
+def board_tab():
     st.header("🤝 Youth Board")
     st.write("Connect with other teens safely using Share Codes - no personal info needed!")
     
@@ -322,20 +422,18 @@ with tab4:
         if st.form_submit_button("Create Post"):
             if post_title and post_detail:
                 share_code = managers['board'].create_post(post_kind, post_title, post_detail)
+                _clear_board_caches()
                 st.success(f"Post created! Share Code: **{share_code}**")
-                st.rerun()
+                st.rerun(scope="fragment")
             else:
                 st.error("Please fill in all fields.")
     
     # View posts
     st.subheader("📋 Available Posts")
     
-    # Filter posts
+    # Filter posts - kind predicate evaluated in SQL
     kind_filter = st.selectbox("Filter by type:", ["All", "study", "carpool", "swap"])
-    posts = managers['board'].get_posts()
-    
-    if kind_filter != "All":
-        posts = [p for p in posts if p['kind'] == kind_filter]
+    posts = _cached_posts(None if kind_filter == "All" else kind_filter)
     
     for post in posts:
         with st.expander(f"📌 {post['title']} ({post['kind'].title()})"):
@@ -346,15 +444,16 @@ with tab4:
             if post['status'] == 'available':
                 if st.button(f"Claim Post", key=f"claim_{post['id']}"):
                     contact_info = managers['board'].claim_post(post['id'])
+                    _clear_board_caches()
                     st.success("Post claimed! Here's the contact info:")
                     st.json(contact_info)
-                    st.rerun()
+                    st.rerun(scope="fragment")
             else:
                 st.info("This post has been claimed.")
     
     # My posts
     st.subheader("📤 My Posts")
-    my_posts = managers['board'].get_my_posts(st.session_state.user_id)
+    my_posts = _cached_my_posts(st.session_state.user_id)
     
     if my_posts:
         for post in my_posts:
@@ -363,12 +462,13 @@ with tab4:
         st.write("You haven't created any posts yet.")
 
 # IndieSim Tab
-with tab5:
+@st.fragment
+def sim_tab():
     st.header("🎯 IndieSim - Scenario Simulator")
     st.write("Practice real-life decisions in a safe environment!")
     
     # Get available scenarios
-    scenarios = managers['sim'].get_available_scenarios()
+    scenarios = _cached_scenarios()
     
     if 'current_scenario' not in st.session_state:
         st.session_state.current_scenario = None
@@ -387,7 +487,7 @@ with tab5:
                     st.session_state.current_scenario = scenario
                     st.session_state.current_step = 0
                     st.session_state.scenario_choices = []
-                    st.rerun()
+                    st.rerun(scope="fragment")
     
     else:
         # Run scenario
@@ -404,7 +504,7 @@ with tab5:
                 if st.button(f"{choice['text']}", key=f"choice_{st.session_state.current_step}_{i}"):
                     st.session_state.scenario_choices.append(choice)
                     st.session_state.current_step += 1
-                    st.rerun()
+                    st.rerun(scope="fragment")
         
         else:
             # Scenario complete - show results
@@ -428,20 +528,22 @@ with tab5:
             # Save results
             if st.button("Save Results"):
                 managers['sim'].save_run(st.session_state.user_id, scenario['id'], score, breakdown)
+                _cached_dashboard.clear()
                 st.success("Results saved! Your Autonomy Index has been updated.")
                 st.session_state.current_scenario = None
                 st.session_state.current_step = 0
                 st.session_state.scenario_choices = []
-                st.rerun()
+                st.rerun(scope="fragment")
             
             if st.button("Try Again"):
                 st.session_state.current_scenario = None
                 st.session_state.current_step = 0
                 st.session_state.scenario_choices = []
-                st.rerun()
+                st.rerun(scope="fragment")
 
 # Settings Tab
-with tab6:
+@st.fragment
+def settings_tab():
     st.header("⚙️ Settings & Safety")
     
     # User settings
@@ -451,70 +553,84 @@ with tab6:
         st.session_state.user_name = new_name
         st.success("Name updated!")
     
-    # Budget settings
+    # Budget settings - staged in a form so dragging a slider doesn't
+    # fire a DB write per rerun, and unchanged values are never re-saved
     st.subheader("💰 Budget Settings")
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        spend_ratio = st.slider("Spend Jar %", 0, 100, 60)
-    
-    with col2:
-        save_ratio = st.slider("Save Jar %", 0, 100, 30)
-    
-    with col3:
-        share_ratio = st.slider("Share Jar %", 0, 100, 10)
-    
-    if spend_ratio + save_ratio + share_ratio != 100:
-        st.warning("Ratios must add up to 100%")
-    else:
-        managers['budget'].update_ratios(st.session_state.user_id, spend_ratio, save_ratio, share_ratio)
-        st.success("Budget ratios updated!")
+    with st.form("ratios_form"):
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            spend_ratio = st.slider("Spend Jar %", 0, 100, 60)
+        
+        with col2:
+            save_ratio = st.slider("Save Jar %", 0, 100, 30)
+        
+        with col3:
+            share_ratio = st.slider("Share Jar %", 0, 100, 10)
+        
+        save_ratios = st.form_submit_button("Save Ratios")
+    
+    if save_ratios:
+        ratios = (spend_ratio, save_ratio, share_ratio)
+        if spend_ratio + save_ratio + share_ratio != 100:
+            st.warning("Ratios must add up to 100%")
+        elif ratios != st.session_state.get('saved_ratios'):
+            managers['budget'].update_ratios(st.session_state.user_id, spend_ratio, save_ratio, share_ratio)
+            st.session_state.saved_ratios = ratios
+            _clear_budget_caches()
+            st.success("Budget ratios updated!")
     
     # Autonomy Index weights
     st.subheader("🎯 Autonomy Index Weights")
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        skills_weight = st.slider("Skills Weight", 0.0, 1.0, 0.30, 0.05)
-        budgeting_weight = st.slider("Budgeting Weight", 0.0, 1.0, 0.30, 0.05)
-    
-    with col2:
-        community_weight = st.slider("Community Weight", 0.0, 1.0, 0.15, 0.05)
-        judgment_weight = st.slider("Judgment Weight", 0.0, 1.0, 0.25, 0.05)
-    
-    total_weight = skills_weight + budgeting_weight + community_weight + judgment_weight
-    if abs(total_weight - 1.0) > 0.01:
-        st.warning(f"Weights must add up to 1.0 (current: {total_weight:.2f})")
-    else:
-        managers['autonomy'].update_weights(skills_weight, budgeting_weight, community_weight, judgment_weight)
-        st.success("Weights updated!")
+    with st.form("weights_form"):
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            skills_weight = st.slider("Skills Weight", 0.0, 1.0, 0.30, 0.05)
+            budgeting_weight = st.slider("Budgeting Weight", 0.0, 1.0, 0.30, 0.05)
+        
+        with col2:
+            community_weight = st.slider("Community Weight", 0.0, 1.0, 0.15, 0.05)
+            judgment_weight = st.slider("Judgment Weight", 0.0, 1.0, 0.25, 0.05)
+        
+        save_weights = st.form_submit_button("Save Weights")
+    
+    if save_weights:
+        weights = (skills_weight, budgeting_weight, community_weight, judgment_weight)
+        total_weight = sum(weights)
+        if abs(total_weight - 1.0) > 0.01:
+            st.warning(f"Weights must add up to 1.0 (current: {total_weight:.2f})")
+        elif weights != st.session_state.get('saved_weights'):
+            managers['autonomy'].update_weights(skills_weight, budgeting_weight, community_weight, judgment_weight)
+            st.session_state.saved_weights = weights
+            _cached_dashboard.clear()
+            _cached_radar_png.clear()
+            st.success("Weights updated!")
     
     # Safety features
     st.subheader("🛡️ Safety Features")
     
-    if 'checkin_timer' not in st.session_state:
-        st.session_state.checkin_timer = None
+    if 'checkin_deadline' not in st.session_state:
+        st.session_state.checkin_deadline = None
     
-    if st.session_state.checkin_timer is None:
+    if st.session_state.checkin_deadline is None:
         if st.button("Start Safety Check-in Timer"):
-            st.session_state.checkin_timer = datetime.now()
+            # Store the deadline once; each rerun is then a single
+            # monotonic-clock subtraction instead of datetime arithmetic
+            st.session_state.checkin_deadline = time.monotonic() + 1800  # 30 minutes
             st.success("Timer started! Check back in 30 minutes.")
     else:
-        elapsed = datetime.now() - st.session_state.checkin_timer
-        if elapsed.total_seconds() < 1800:  # 30 minutes
-            remaining = 1800 - elapsed.total_seconds()
-            st.write(f"⏰ Safety timer: {int(remaining // 60)}m {int(remaining % 60)}s remaining")
-            
-            if st.button("I'm Safe - Stop Timer"):
-                st.session_state.checkin_timer = None
-                st.success("Timer stopped. Stay safe!")
-                st.rerun()
+        remaining = st.session_state.checkin_deadline - time.monotonic()
+        if remaining > 0:
+            minutes, seconds = divmod(int(remaining), 60)
+            st.write(f"⏰ Safety timer: {minutes}m {seconds}s remaining")
         else:
             st.warning("⚠️ Safety check-in overdue!")
-            if st.button("I'm Safe - Stop Timer"):
-                st.session_state.checkin_timer = None
-                st.success("Timer stopped. Stay safe!")
-                st.rerun()
+        
+        if st.button("I'm Safe - Stop Timer"):
+            st.session_state.checkin_deadline = None
+            st.success("Timer stopped. Stay safe!")
+            st.rerun(scope="fragment")
     
     # Data management
     st.subheader("📊 Data Management")
@@ -524,9 +640,11 @@ with tab6:
     with col1:
         if st.button("📤 Export Data"):
             data = export_data(st.session_state.user_id)
+            # orjson serializes at C level straight to bytes - no
+            # intermediate str and no second copy for the download
             st.download_button(
                 label="Download JSON",
-                data=json.dumps(data, indent=2),
+                data=orjson.dumps(data, option=orjson.OPT_INDENT_2),
                 file_name=f"indiepilot_data_{datetime.now().strftime('%Y%m%d')}.json",
                 mime="application/json"
             )
@@ -535,9 +653,16 @@ with tab6:
         uploaded_file = st.file_uploader("📥 Import Data", type=['json'])
         if uploaded_file is not None:
             try:
-                data = json.load(uploaded_file)
-                import_data(st.session_state.user_id, data)
-                st.success("Data imported successfully!")
+                data = orjson.loads(uploaded_file.read())
+                if import_data(st.session_state.user_id, data):
+                    # The import writes straight to the tables, so every
+                    # derived cache is stale, not just the budget ones
+                    _clear_budget_caches()
+                    _clear_quest_caches()
+                    _clear_board_caches()
+                    st.success("Data imported successfully!")
+                else:
+                    st.error("Import failed: invalid export file")
             except Exception as e:
                 st.error(f"Import failed: {str(e)}")
     
@@ -547,6 +672,19 @@ with tab6:
         seed_database()
         st.success("Demo data reset! Refresh the page to see changes.")
 
+with tab1:
+    dashboard_tab()
+with tab2:
+    budget_tab()
+with tab3:
+    quests_tab()
+with tab4:
+    board_tab()
+with tab5:
+    sim_tab()
+with tab6:
+    settings_tab()
+
 # Footer
 st.markdown("---")
 st.markdown("""
@@ -1,6 +1,12 @@
 -- IndiePilot Database Schema
 -- SQLite database for offline-first teen independence app
 
+-- App metadata (seed markers etc.)
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER
+);
+
 -- User table
 CREATE TABLE IF NOT EXISTS user (
     id TEXT PRIMARY KEY,
@@ -76,6 +82,106 @@ CREATE TABLE IF NOT EXISTS sim_run (
     FOREIGN KEY (user_id) REFERENCES user(id)
 );
 
+-- Full-text index over board posts. LIKE '%term%' cannot use a B-tree
+-- index and scans the whole table; FTS5 answers in O(matching terms).
+CREATE VIRTUAL TABLE IF NOT EXISTS board_post_fts USING fts5(
+    title, detail,
+    content='board_post', content_rowid='rowid'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_board_post_fts_insert AFTER INSERT ON board_post
+BEGIN
+    INSERT INTO board_post_fts (rowid, title, detail) VALUES (NEW.rowid, NEW.title, NEW.detail);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_board_post_fts_delete AFTER DELETE ON board_post
+BEGIN
+    INSERT INTO board_post_fts (board_post_fts, rowid, title, detail) VALUES ('delete', OLD.rowid, OLD.title, OLD.detail);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_board_post_fts_update AFTER UPDATE OF title, detail ON board_post
+BEGIN
+    INSERT INTO board_post_fts (board_post_fts, rowid, title, detail) VALUES ('delete', OLD.rowid, OLD.title, OLD.detail);
+    INSERT INTO board_post_fts (rowid, title, detail) VALUES (NEW.rowid, NEW.title, NEW.detail);
+END;
+
+-- One-time rebuild from the content table so databases that predate
+-- the triggers start in sync; the meta marker keeps later init_db()
+-- runs from re-indexing the whole table on every app start
+INSERT INTO board_post_fts (board_post_fts)
+SELECT 'rebuild' WHERE NOT EXISTS (SELECT 1 FROM meta WHERE key = 'fts_synced');
+INSERT OR IGNORE INTO meta (key, value) VALUES ('fts_synced', 1);
+
+-- Materialized per-user activity counters for the Autonomy Index.
+-- Maintained by the triggers below so dashboard reads are one point
+-- select instead of COUNT(*) scans over four tables.
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id TEXT PRIMARY KEY,
+    completed_quests INTEGER NOT NULL DEFAULT 0,
+    posts_created INTEGER NOT NULL DEFAULT 0,
+    posts_claimed INTEGER NOT NULL DEFAULT 0,
+    sim_runs INTEGER NOT NULL DEFAULT 0,
+    last_update DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_user_stats_post AFTER INSERT ON board_post
+BEGIN
+    INSERT INTO user_stats (user_id, posts_created) VALUES (NEW.user_id, 1)
+    ON CONFLICT(user_id) DO UPDATE SET
+        posts_created = posts_created + 1,
+        last_update = CURRENT_TIMESTAMP;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_user_stats_claim AFTER INSERT ON board_claim
+BEGIN
+    INSERT INTO user_stats (user_id, posts_claimed) VALUES (NEW.user_id, 1)
+    ON CONFLICT(user_id) DO UPDATE SET
+        posts_claimed = posts_claimed + 1,
+        last_update = CURRENT_TIMESTAMP;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_user_stats_sim AFTER INSERT ON sim_run
+BEGIN
+    INSERT INTO user_stats (user_id, sim_runs) VALUES (NEW.user_id, 1)
+    ON CONFLICT(user_id) DO UPDATE SET
+        sim_runs = sim_runs + 1,
+        last_update = CURRENT_TIMESTAMP;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_user_stats_quest AFTER UPDATE OF completed_at ON quest_progress
+WHEN NEW.completed_at IS NOT NULL AND OLD.completed_at IS NULL
+BEGIN
+    INSERT INTO user_stats (user_id, completed_quests) VALUES (NEW.user_id, 1)
+    ON CONFLICT(user_id) DO UPDATE SET
+        completed_quests = completed_quests + 1,
+        last_update = CURRENT_TIMESTAMP;
+END;
+
+-- Imports insert progress rows with completed_at already set, which the
+-- UPDATE trigger above never sees
+CREATE TRIGGER IF NOT EXISTS trg_user_stats_quest_insert AFTER INSERT ON quest_progress
+WHEN NEW.completed_at IS NOT NULL
+BEGIN
+    INSERT INTO user_stats (user_id, completed_quests) VALUES (NEW.user_id, 1)
+    ON CONFLICT(user_id) DO UPDATE SET
+        completed_quests = completed_quests + 1,
+        last_update = CURRENT_TIMESTAMP;
+END;
+
+-- One-time backfill for databases that predate the triggers, guarded by
+-- a meta marker like the FTS rebuild above. Without it, the first
+-- trigger fire seeds a row with zeros for the other counters and that
+-- partial row is then trusted as current.
+INSERT OR REPLACE INTO user_stats (user_id, completed_quests, posts_created, posts_claimed, sim_runs)
+SELECT u.id,
+    (SELECT COUNT(*) FROM quest_progress qp WHERE qp.user_id = u.id AND qp.completed_at IS NOT NULL),
+    (SELECT COUNT(*) FROM board_post bp WHERE bp.user_id = u.id),
+    (SELECT COUNT(*) FROM board_claim bc WHERE bc.user_id = u.id),
+    (SELECT COUNT(*) FROM sim_run sr WHERE sr.user_id = u.id)
+FROM user u
+WHERE NOT EXISTS (SELECT 1 FROM meta WHERE key = 'user_stats_backfilled');
+INSERT OR IGNORE INTO meta (key, value) VALUES ('user_stats_backfilled', 1);
+
 -- User settings
 CREATE TABLE IF NOT EXISTS user_settings (
     user_id TEXT PRIMARY KEY,
@@ -91,9 +197,27 @@ CREATE TABLE IF NOT EXISTS user_settings (
 
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_budget_log_user_ts ON budget_log(user_id, ts);
+CREATE INDEX IF NOT EXISTS idx_budget_log_user_jar ON budget_log(user_id, jar);
+-- Covering expression index: the streak query's DISTINCT DATE(ts) is
+-- answered from the index without touching table pages
+CREATE INDEX IF NOT EXISTS idx_budget_log_user_date ON budget_log(user_id, DATE(ts));
+CREATE INDEX IF NOT EXISTS idx_quest_difficulty ON quest(difficulty);
 CREATE INDEX IF NOT EXISTS idx_quest_progress_user ON quest_progress(user_id);
 CREATE INDEX IF NOT EXISTS idx_quest_progress_completed ON quest_progress(completed_at);
 CREATE INDEX IF NOT EXISTS idx_board_post_status ON board_post(status);
 CREATE INDEX IF NOT EXISTS idx_board_post_share_code ON board_post(share_code);
 CREATE INDEX IF NOT EXISTS idx_sim_run_user ON sim_run(user_id);
-CREATE INDEX IF NOT EXISTS idx_sim_run_ts ON sim_run(ran_at); 
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_sim_run_ts ON sim_run(ran_at);
+
+-- Composite indexes for the user-scoped hot-path queries
+CREATE INDEX IF NOT EXISTS idx_quest_progress_user_completed ON quest_progress(user_id, completed_at);
+CREATE INDEX IF NOT EXISTS idx_board_post_user ON board_post(user_id);
+CREATE INDEX IF NOT EXISTS idx_board_claim_user ON board_claim(user_id);
+CREATE INDEX IF NOT EXISTS idx_board_post_kind_status ON board_post(kind, status);
+-- Covering index for per-user run history: WHERE user_id ORDER BY ran_at
+-- DESC LIMIT n is answered entirely from the index, no table pages.
+-- Replaces the narrower idx_sim_run_user_ran (dropped below).
+CREATE INDEX IF NOT EXISTS idx_sim_run_user_history ON sim_run(user_id, ran_at DESC, scenario_id, score, breakdown);
+DROP INDEX IF EXISTS idx_sim_run_user_ran;
+CREATE INDEX IF NOT EXISTS idx_board_post_created ON board_post(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_board_claim_claimed ON board_claim(claimed_at DESC); 
\ No newline at end of file
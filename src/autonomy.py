@@ -3,30 +3,82 @@ Autonomy module for IndiePilot
 Handles Autonomy Index calculation and radar chart generation
 """
 
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-from matplotlib.patches import Circle, RegularPolygon
-from matplotlib.path import Path
-from matplotlib.projections.polar import PolarAxes
-from matplotlib.projections import register_projection
-from matplotlib.spines import Spine
-from matplotlib.transforms import Affine2D
+import io
 import numpy as np
-from typing import Dict, List, Any
-from .db import safe_query, get_user_settings, update_user_settings
+from bisect import bisect
+from functools import lru_cache
+from typing import Dict, List, Any, Optional
+from .db import safe_query, safe_execute, get_user_settings, update_user_settings
 from .budget import BudgetManager
 from .quests import QuestManager
 from .board import BoardManager
-from .sim import SimManager
+from .sim import sim_manager
+
+# Insight messages as (cutoffs, messages) lookup tables: bisect picks the
+# tier in one C-level binary search per area instead of an if/elif chain,
+# and adding a new tier is a data edit rather than a new branch
+_INSIGHT_TABLES = {
+    'skills': ((30, 70), (
+        "💡 Try completing some beginner quests to build your life skills foundation!",
+        "🎯 Great progress on skills! Consider tackling some intermediate quests.",
+        "🏆 Excellent skills development! You're ready for advanced challenges."
+    )),
+    'budgeting': ((40, 80), (
+        "💰 Start logging your expenses regularly to improve your financial awareness.",
+        "📊 Good budgeting habits! Try to increase your savings ratio.",
+        "💎 Outstanding financial management! You're building great money habits."
+    )),
+    'community': ((20, 60), (
+        "🤝 Connect with others on the Youth Board to build your community score.",
+        "👥 Nice community engagement! Try both creating and responding to posts.",
+        "🌟 Excellent community participation! You're a great team player."
+    )),
+    'judgment': ((50, 80), (
+        "🎯 Practice decision-making with IndieSim scenarios to improve your judgment.",
+        "🧠 Good judgment skills! Keep practicing different scenarios.",
+        "🧠 Outstanding decision-making! You show excellent judgment in complex situations."
+    ))
+}
 
 class AutonomyIndex:
     """Manages Autonomy Index calculation and visualization"""
-    
+
+    # Constant SQL text so sqlite3's per-connection statement cache can
+    # reuse the compiled statements on these hot paths
+    _SQL_USER_STATS = """
+        SELECT completed_quests, posts_created, posts_claimed, sim_runs
+        FROM user_stats
+        WHERE user_id = ?
+    """
+    _SQL_BACKFILL_COUNTS = """
+        SELECT
+            (SELECT COUNT(*) FROM quest_progress WHERE user_id = ? AND completed_at IS NOT NULL) as completed_quests,
+            (SELECT COUNT(*) FROM board_post WHERE user_id = ?) as posts_created,
+            (SELECT COUNT(*) FROM board_claim WHERE user_id = ?) as posts_claimed,
+            (SELECT COUNT(*) FROM sim_run WHERE user_id = ?) as sim_runs
+    """
+    _SQL_INSERT_STATS = """
+        INSERT OR IGNORE INTO user_stats (user_id, completed_quests, posts_created, posts_claimed, sim_runs)
+        VALUES (?, ?, ?, ?, ?)
+    """
+    _SQL_JUDGMENT_AVG = """
+        SELECT COALESCE(AVG(score), 50.0) as avg_score FROM (
+            SELECT score FROM sim_run
+            WHERE user_id = ?
+            ORDER BY ran_at DESC
+            LIMIT 5
+        )
+    """
+
     def __init__(self):
         self.budget_manager = BudgetManager()
         self.quest_manager = QuestManager()
         self.board_manager = BoardManager()
-        self.sim_manager = SimManager()
+        self.sim_manager = sim_manager
+        
+        # Per-render memoization of the aggregate fetch so the index,
+        # insights, and milestones for one user share a single DB trip
+        self._aggregates_cache: Dict[str, Dict[str, Any]] = {}
         
         # Default weights for Autonomy Index calculation
         self.default_weights = {
@@ -56,147 +108,135 @@ class AutonomyIndex:
             'judgment': settings['judgment_weight']
         }
         
-        # Calculate individual scores
-        skills_score = self._calculate_skills_score(user_id)
-        budgeting_score = self._calculate_budgeting_score(user_id)
-        community_score = self._calculate_community_score(user_id)
-        judgment_score = self._calculate_judgment_score(user_id)
+        # Skip pillars whose weight is zero - a disabled pillar contributes
+        # nothing to the sum, so there is no reason to pay its queries
+        # (budgeting in particular costs several via BudgetManager)
+        if weights['skills'] > 0 or weights['community'] > 0 or weights['judgment'] > 0:
+            aggregates = self._fetch_user_aggregates(user_id)
+        
+        skills = self._calculate_skills_score(aggregates) if weights['skills'] > 0 else 0.0
+        budgeting = self._calculate_budgeting_score(user_id) if weights['budgeting'] > 0 else 0.0
+        community = self._calculate_community_score(aggregates) if weights['community'] > 0 else 0.0
+        judgment = self._calculate_judgment_score(aggregates) if weights['judgment'] > 0 else 0.0
         
         # Calculate weighted sum
         autonomy_index = (
-            skills_score * weights['skills'] +
-            budgeting_score * weights['budgeting'] +
-            community_score * weights['community'] +
-            judgment_score * weights['judgment']
+            skills * weights['skills'] +
+            budgeting * weights['budgeting'] +
+            community * weights['community'] +
+            judgment * weights['judgment']
         )
         
         return round(autonomy_index, 1)
     
-    def _calculate_skills_score(self, user_id: str) -> float:
-        """Calculate skills score based on completed quests (0-100)"""
-        completed_quests = safe_query("""
-            SELECT COUNT(*) as count
-            FROM quest_progress
-            WHERE user_id = ? AND completed_at IS NOT NULL
-        """, (user_id,))
+    def _fetch_user_aggregates(self, user_id: str) -> Dict[str, Any]:
+        """
+        Fetch the per-user counters the score helpers need.
+
+        Counters come from the trigger-maintained user_stats row - one
+        point select instead of COUNT(*) over four tables. Users created
+        before the triggers existed get their row backfilled once from
+        the base tables. Results are memoized per user until
+        reset_cache() is called after a write.
+        """
+        cached = self._aggregates_cache.get(user_id)
+        if cached is not None:
+            return cached
         
-        count = completed_quests[0]['count'] if completed_quests else 0
-        return min(100, count * 10)
+        stats = safe_query(self._SQL_USER_STATS, (user_id,))
+        
+        if stats:
+            row = stats[0]
+        else:
+            # Backfill from the base tables; the triggers keep the row
+            # current from here on
+            counts = safe_query(self._SQL_BACKFILL_COUNTS, (user_id, user_id, user_id, user_id))
+            row = counts[0]
+            safe_execute(self._SQL_INSERT_STATS,
+                         (user_id, row['completed_quests'], row['posts_created'],
+                          row['posts_claimed'], row['sim_runs']))
+        
+        # Average the last five sim scores server-side - one scalar comes
+        # back instead of five rows to reduce in Python
+        judgment = safe_query(self._SQL_JUDGMENT_AVG, (user_id,))
+        
+        aggregates = {
+            'skills_count': row['completed_quests'],
+            'posts_count': row['posts_created'],
+            'claims_count': row['posts_claimed'],
+            'runs_count': row['sim_runs'],
+            'judgment_avg': judgment[0]['avg_score'] if judgment else 50.0
+        }
+        self._aggregates_cache[user_id] = aggregates
+        return aggregates
+    
+    def reset_cache(self, user_id: Optional[str] = None):
+        """Drop memoized aggregates after a write (all users if None)"""
+        if user_id is None:
+            self._aggregates_cache.clear()
+        else:
+            self._aggregates_cache.pop(user_id, None)
+        # The budgeting score reads through this instance's own
+        # BudgetManager, whose memoized balances/streak the app's write
+        # paths can't reach - drop them together with the aggregates
+        self.budget_manager.reset_cache(user_id)
+    
+    def _calculate_skills_score(self, aggregates: Dict[str, Any]) -> float:
+        """Calculate skills score based on completed quests (0-100)"""
+        return min(100, aggregates['skills_count'] * 10)
     
     def _calculate_budgeting_score(self, user_id: str) -> float:
         """Calculate budgeting score (0-100)"""
-        # Get financial health score from budget manager
-        base_score = self.budget_manager.get_financial_health_score(user_id)
-        
-        # Get current streak for bonus
-        streak = self.budget_manager.get_current_streak(user_id)
-        streak_bonus = min(20, streak * 2)  # Up to 20 points for streaks
+        # One snapshot call - the old version re-fetched the overview and
+        # streak three times over via separate BudgetManager calls
+        snapshot = self.budget_manager.get_budget_snapshot(user_id)
+        overview = snapshot['overview']
         
-        # Check for overspending penalty
-        overview = self.budget_manager.get_budget_overview(user_id)
-        total = overview['total']
+        base_score = snapshot['health_score']
+        streak_bonus = min(20, snapshot['streak'] * 2)  # Up to 20 points for streaks
         
-        if total > 0:
-            spend_ratio = overview['spend'] / total
-            overspend_penalty = max(0, (spend_ratio - 0.7) * 100)  # Penalty if spending > 70%
-        else:
-            overspend_penalty = 0
+        # Overspending penalty if spending > 70% of total
+        spend_ratio = overview['spend'] / overview['total'] if overview['total'] else 0.0
+        overspend_penalty = max(0.0, (spend_ratio - 0.7) * 100.0)
         
         final_score = base_score + streak_bonus - overspend_penalty
-        return max(0, min(100, final_score))
+        return float(np.clip(final_score, 0.0, 100.0))
     
-    def _calculate_community_score(self, user_id: str) -> float:
+    def _calculate_community_score(self, aggregates: Dict[str, Any]) -> float:
         """Calculate community score based on board activity (0-100)"""
         # Posts created (5 points each, max 50)
-        posts_created = safe_query("""
-            SELECT COUNT(*) as count FROM board_post WHERE user_id = ?
-        """, (user_id,))
-        posts_score = min(50, (posts_created[0]['count'] if posts_created else 0) * 5)
+        posts_score = min(50, aggregates['posts_count'] * 5)
         
         # Posts claimed (10 points each, max 50)
-        posts_claimed = safe_query("""
-            SELECT COUNT(*) as count FROM board_claim WHERE user_id = ?
-        """, (user_id,))
-        claims_score = min(50, (posts_claimed[0]['count'] if posts_claimed else 0) * 10)
+        claims_score = min(50, aggregates['claims_count'] * 10)
         
         total_score = posts_score + claims_score
         return min(100, total_score)
     
-    def _calculate_judgment_score(self, user_id: str) -> float:
+    def _calculate_judgment_score(self, aggregates: Dict[str, Any]) -> float:
         """Calculate judgment score based on simulation performance (0-100)"""
-        # Get last 5 simulation scores
-        recent_runs = safe_query("""
-            SELECT score FROM sim_run
-            WHERE user_id = ?
-            ORDER BY ran_at DESC
-            LIMIT 5
-        """, (user_id,))
-        
-        if not recent_runs:
-            return 50.0  # Default score if no runs
-        
-        scores = [run['score'] for run in recent_runs]
-        avg_score = sum(scores) / len(scores)
-        
-        return avg_score
+        # Averaged in SQL; COALESCE supplies the 50.0 default when no runs
+        return float(aggregates['judgment_avg'])
     
     def get_individual_scores(self, user_id: str) -> Dict[str, float]:
         """Get individual scores for all four areas"""
+        aggregates = self._fetch_user_aggregates(user_id)
         return {
-            'skills': self._calculate_skills_score(user_id),
+            'skills': self._calculate_skills_score(aggregates),
             'budgeting': self._calculate_budgeting_score(user_id),
-            'community': self._calculate_community_score(user_id),
-            'judgment': self._calculate_judgment_score(user_id)
+            'community': self._calculate_community_score(aggregates),
+            'judgment': self._calculate_judgment_score(aggregates)
         }
     
     def plot_radar(self, user_id: str):
         """Create a radar chart showing the four autonomy areas"""
         # Get individual scores
         scores = self.get_individual_scores(user_id)
-        
-        # Categories for the radar chart
-        categories = ['Skills', 'Budgeting', 'Community', 'Judgment']
-        values = [scores['skills'], scores['budgeting'], scores['community'], scores['judgment']]
-        
-        # Number of variables
-        N = len(categories)
-        
-        # Create the angle for each axis
-        angles = [n / float(N) * 2 * np.pi for n in range(N)]
-        angles += angles[:1]  # Complete the circle
-        
-        # Add the first value to the end to close the plot
-        values += values[:1]
-        
-        # Create the figure
-        fig, ax = plt.subplots(figsize=(8, 8), subplot_kw=dict(projection='polar'))
-        
-        # Plot the data
-        ax.plot(angles, values, 'o-', linewidth=2, color='#1f77b4', label='Your Score')
-        ax.fill(angles, values, alpha=0.25, color='#1f77b4')
-        
-        # Set the labels
-        ax.set_xticks(angles[:-1])
-        ax.set_xticklabels(categories, fontsize=12, fontweight='bold')
-        
-        # Set the y-axis limits
-        ax.set_ylim(0, 100)
-        
-        # Add grid
-        ax.grid(True, alpha=0.3)
-        
-        # Add value labels
-        for i, (angle, value) in enumerate(zip(angles[:-1], values[:-1])):
-            ax.text(angle, value + 5, f'{value:.0f}', 
-                   ha='center', va='center', fontsize=10, fontweight='bold')
-        
-        # Add title
-        plt.title('Your Independence Radar', fontsize=16, fontweight='bold', pad=20)
-        
-        # Add legend
-        plt.legend(loc='upper right', bbox_to_anchor=(1.3, 1.0))
-        
-        return fig
+        return self.plot_radar_from_values(scores)
+
+    def plot_radar_from_values(self, scores: Dict[str, float]):
+        """Create a radar chart from precomputed scores (no DB access)"""
+        return _build_radar_figure(scores)
     
     def update_weights(self, skills_weight: float, budgeting_weight: float, 
                       community_weight: float, judgment_weight: float) -> bool:
@@ -224,71 +264,35 @@ class AutonomyIndex:
         
         current_score = self.compute_autonomy_index(user_id)
         
-        # Generate a simple trend (in real app, this would be actual historical data)
-        trend = []
-        for i in range(days, 0, -1):
-            # Simulate some variation in the score
-            variation = np.random.normal(0, 2)  # Small random variation
-            trend_score = max(0, min(100, current_score + variation))
-            
-            trend.append({
-                'date': f"Day {i}",
-                'score': round(trend_score, 1)
-            })
+        # Generate a simple trend (in real app, this would be actual historical data).
+        # One vectorized draw + clip instead of a scalar np.random.normal
+        # call (and max/min pair) per day.
+        variations = np.random.normal(0, 2, size=days)
+        trend_scores = np.clip(current_score + variations, 0, 100).round(1)
         
-        return trend
+        return [
+            {'date': f"Day {i}", 'score': float(score)}
+            for i, score in zip(range(days, 0, -1), trend_scores)
+        ]
     
     def get_autonomy_insights(self, user_id: str) -> List[str]:
         """Get personalized insights based on autonomy scores"""
         scores = self.get_individual_scores(user_id)
-        insights = []
-        
-        # Skills insights
-        if scores['skills'] < 30:
-            insights.append("💡 Try completing some beginner quests to build your life skills foundation!")
-        elif scores['skills'] < 70:
-            insights.append("🎯 Great progress on skills! Consider tackling some intermediate quests.")
-        else:
-            insights.append("🏆 Excellent skills development! You're ready for advanced challenges.")
-        
-        # Budgeting insights
-        if scores['budgeting'] < 40:
-            insights.append("💰 Start logging your expenses regularly to improve your financial awareness.")
-        elif scores['budgeting'] < 80:
-            insights.append("📊 Good budgeting habits! Try to increase your savings ratio.")
-        else:
-            insights.append("💎 Outstanding financial management! You're building great money habits.")
-        
-        # Community insights
-        if scores['community'] < 20:
-            insights.append("🤝 Connect with others on the Youth Board to build your community score.")
-        elif scores['community'] < 60:
-            insights.append("👥 Nice community engagement! Try both creating and responding to posts.")
-        else:
-            insights.append("🌟 Excellent community participation! You're a great team player.")
-        
-        # Judgment insights
-        if scores['judgment'] < 50:
-            insights.append("🎯 Practice decision-making with IndieSim scenarios to improve your judgment.")
-        elif scores['judgment'] < 80:
-            insights.append("🧠 Good judgment skills! Keep practicing different scenarios.")
-        else:
-            insights.append("🧠 Outstanding decision-making! You show excellent judgment in complex situations.")
-        
-        return insights
+        return [
+            messages[bisect(cutoffs, scores[area])]
+            for area, (cutoffs, messages) in _INSIGHT_TABLES.items()
+        ]
     
     def get_next_milestones(self, user_id: str) -> List[Dict[str, Any]]:
         """Get next milestones for the user to achieve"""
-        scores = self.get_individual_scores(user_id)
+        # The milestone math only needs the raw counters, which all come
+        # from the (memoized) single-row aggregates fetch - no need to
+        # evaluate the full scores here
+        aggregates = self._fetch_user_aggregates(user_id)
         milestones = []
         
         # Skills milestones
-        current_quests = safe_query("""
-            SELECT COUNT(*) as count
-            FROM quest_progress
-            WHERE user_id = ? AND completed_at IS NOT NULL
-        """, (user_id,))
-        quest_count = current_quests[0]['count'] if current_quests else 0
+        quest_count = aggregates['skills_count']
         
         next_quest_milestone = ((quest_count // 5) + 1) * 5
         if next_quest_milestone <= 20:  # Cap at 20 quests
@@ -313,10 +317,7 @@ class AutonomyIndex:
             })
         
         # Community milestones
-        posts_created = safe_query("""
-            SELECT COUNT(*) as count FROM board_post WHERE user_id = ?
-        """, (user_id,))
-        posts_count = posts_created[0]['count'] if posts_created else 0
+        posts_count = aggregates['posts_count']
         
         next_post_milestone = ((posts_count // 3) + 1) * 3
         if next_post_milestone <= 15:  # Cap at 15 posts
@@ -329,10 +330,7 @@ class AutonomyIndex:
             })
         
         # Judgment milestones
-        sim_runs = safe_query("""
-            SELECT COUNT(*) as count FROM sim_run WHERE user_id = ?
-        """, (user_id,))
-        runs_count = sim_runs[0]['count'] if sim_runs else 0
+        runs_count = aggregates['runs_count']
         
         next_sim_milestone = ((runs_count // 2) + 1) * 2
         if next_sim_milestone <= 10:  # Cap at 10 runs
@@ -344,4 +342,76 @@ class AutonomyIndex:
                 'reward': '+20 Judgment Points'
             })
         
-        return milestones 
\ No newline at end of file
+        return milestones 
+
+def _build_radar_figure(scores: Dict[str, float]):
+    """Build the polar radar Figure for a scores dict"""
+    # Deferred so importing this module doesn't pay matplotlib's
+    # startup cost unless a chart is actually drawn
+    import matplotlib.pyplot as plt
+
+    # Categories for the radar chart
+    categories = ['Skills', 'Budgeting', 'Community', 'Judgment']
+    values = [scores['skills'], scores['budgeting'], scores['community'], scores['judgment']]
+    
+    # Number of variables
+    N = len(categories)
+    
+    # Evenly spaced angles with the wrap-around point included, and
+    # values closed the same way - both in single NumPy calls
+    angles = np.linspace(0, 2 * np.pi, N + 1)
+    values = np.concatenate([values, values[:1]])
+    
+    # Create the figure
+    fig, ax = plt.subplots(figsize=(8, 8), subplot_kw=dict(projection='polar'))
+    
+    # Plot the data
+    ax.plot(angles, values, 'o-', linewidth=2, color='#1f77b4', label='Your Score')
+    ax.fill(angles, values, alpha=0.25, color='#1f77b4')
+    
+    # Set the labels
+    ax.set_xticks(angles[:-1])
+    ax.set_xticklabels(categories, fontsize=12, fontweight='bold')
+    
+    # Set the y-axis limits
+    ax.set_ylim(0, 100)
+    
+    # Add grid
+    ax.grid(True, alpha=0.3)
+    
+    # Add value labels
+    for i, (angle, value) in enumerate(zip(angles[:-1], values[:-1])):
+        ax.text(angle, value + 5, f'{value:.0f}', 
+               ha='center', va='center', fontsize=10, fontweight='bold')
+    
+    # Add title
+    plt.title('Your Independence Radar', fontsize=16, fontweight='bold', pad=20)
+    
+    # Add legend
+    plt.legend(loc='upper right', bbox_to_anchor=(1.3, 1.0))
+    
+    return fig
+
+
+@lru_cache(maxsize=512)
+def _radar_png_cached(values_key: tuple) -> bytes:
+    """Render radar PNG bytes, memoized by the plotted values.
+
+    Score tuples change slowly relative to page renders, so most calls
+    skip matplotlib entirely. The Agg backend avoids any display-server
+    state, and the figure is closed right away so matplotlib's global
+    registry doesn't accumulate figures across cache misses.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig = _build_radar_figure(dict(values_key))
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=90, bbox_inches='tight')
+    plt.close(fig)
+    return buf.getvalue()
+
+def render_radar_png(scores: Dict[str, float]) -> bytes:
+    """Return cached PNG bytes of the radar chart for a scores dict"""
+    return _radar_png_cached(tuple(sorted(scores.items())))
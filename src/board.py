@@ -3,16 +3,63 @@ Board module for IndiePilot
 Handles Youth Board posts, share codes, and privacy-first community features
 """
 
+import json
 import random
+import sqlite3
 import string
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 from .db import safe_query, safe_execute
 from .utils import generate_id
 
+# Hoisted out of generate_share_code: the alphabet and per-kind prefixes
+# are constants, so there is no need to rebuild the string or slice the
+# kind on every call (including collision retries)
+_CODE_ALPHABET = string.ascii_uppercase + string.digits
+_CODE_PREFIXES = {'study': 'STUD', 'carpool': 'CARP', 'swap': 'SWAP'}
+
 class BoardManager:
     """Manages the Youth Board with privacy-first features"""
-    
+
+    # Constant SQL text so sqlite3's per-connection statement cache can
+    # reuse the compiled statements on these hot paths
+    _SQL_INSERT_POST = """
+        INSERT INTO board_post (id, user_id, kind, title, detail, share_code)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """
+    _SQL_POST_BY_ID = """
+        SELECT id, user_id, kind, title, detail, share_code,
+               substr(created_at, 1, 19) as created_at, status
+        FROM board_post
+        WHERE id = ?
+    """
+    _SQL_POST_BY_SHARE_CODE = """
+        SELECT id, user_id, kind, title, detail, share_code,
+               substr(created_at, 1, 19) as created_at, status
+        FROM board_post
+        WHERE share_code = ?
+    """
+    _SQL_MY_POSTS = """
+        SELECT id, kind, title, detail, share_code,
+               substr(created_at, 1, 19) as created_at, status
+        FROM board_post
+        WHERE user_id = ?
+        ORDER BY created_at DESC
+    """
+    _SQL_MY_CLAIMS = """
+        SELECT 
+            bc.id, substr(bc.claimed_at, 1, 19) as claimed_at, bc.mock_contact,
+            bp.kind, bp.title, bp.detail, bp.share_code
+        FROM board_claim bc
+        JOIN board_post bp ON bc.post_id = bp.id
+        WHERE bc.user_id = ?
+        ORDER BY bc.claimed_at DESC
+    """
+    _SQL_INSERT_CLAIM = """
+        INSERT INTO board_claim (id, post_id, user_id, mock_contact)
+        VALUES (?, ?, ?, ?)
+    """
+
     def __init__(self):
         self.mock_contacts = [
             {
@@ -51,12 +98,18 @@ class BoardManager:
                 'availability': 'Flexible schedule'
             }
         ]
+        # Contacts are static, so serialize each one once here instead of
+        # JSON-encoding on every claim
+        self._contact_pairs = tuple(
+            (contact, json.dumps(contact)) for contact in self.mock_contacts
+        )
+        self._n_contacts = len(self._contact_pairs)
     
     def generate_share_code(self, kind: str) -> str:
         """Generate a unique share code for a post"""
-        # Format: KIND-XXXX (e.g., STDY-A9F4)
-        prefix = kind.upper()[:4]
-        suffix = ''.join(random.choices(string.ascii_uppercase + string.digits, k=4))
+        # Format: KIND-XXXX (e.g., STUD-A9F4)
+        prefix = _CODE_PREFIXES.get(kind, kind.upper()[:4])
+        suffix = ''.join(random.choices(_CODE_ALPHABET, k=4))
         return f"{prefix}-{suffix}"
     
     def create_post(self, kind: str, title: str, detail: str, user_id: str = None) -> str:
@@ -64,32 +117,25 @@ class BoardManager:
         if kind not in ['study', 'carpool', 'swap']:
             raise ValueError("Invalid post kind")
         
-        # Generate unique share code
-        share_code = self.generate_share_code(kind)
-        
-        # Ensure uniqueness
-        while self._share_code_exists(share_code):
+        # The UNIQUE constraint on share_code handles collision detection,
+        # so the happy path is a single INSERT with no existence SELECT.
+        # Collisions are rare (36^4 code space) - just regenerate and retry.
+        for _ in range(5):
             share_code = self.generate_share_code(kind)
-        
-        # Create the post
-        safe_execute("""
-            INSERT INTO board_post (id, user_id, kind, title, detail, share_code)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (generate_id(), user_id or 'demo_user', kind, title, detail, share_code))
-        
-        return share_code
-    
-    def _share_code_exists(self, share_code: str) -> bool:
-        """Check if a share code already exists"""
-        result = safe_query("""
-            SELECT id FROM board_post WHERE share_code = ?
-        """, (share_code,))
-        return bool(result)
+            try:
+                safe_execute(self._SQL_INSERT_POST,
+                             (generate_id(), user_id or 'demo_user', kind, title, detail, share_code))
+                return share_code
+            except sqlite3.IntegrityError:
+                continue
+        
+        raise RuntimeError("Could not generate a unique share code")
     
     def get_posts(self, kind: str = None, status: str = None) -> List[Dict[str, Any]]:
         """Get board posts with optional filtering"""
         query = """
-            SELECT id, user_id, kind, title, detail, share_code, created_at, status
+            SELECT id, user_id, kind, title, detail, share_code,
+                   substr(created_at, 1, 19) as created_at, status
             FROM board_post
         """
         params = []
@@ -107,43 +153,19 @@ class BoardManager:
         
         query += " ORDER BY created_at DESC"
         
-        posts = safe_query(query, tuple(params))
-        
-        # Format dates
-        for post in posts:
-            post['created_at'] = post['created_at'][:19]  # Remove microseconds
-        
-        return posts
+        return safe_query(query, tuple(params))
     
     def get_post_by_id(self, post_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific post by ID"""
-        posts = safe_query("""
-            SELECT id, user_id, kind, title, detail, share_code, created_at, status
-            FROM board_post
-            WHERE id = ?
-        """, (post_id,))
-        
-        if not posts:
-            return None
+        posts = safe_query(self._SQL_POST_BY_ID, (post_id,))
         
-        post = posts[0]
-        post['created_at'] = post['created_at'][:19]
-        return post
+        return posts[0] if posts else None
     
     def get_post_by_share_code(self, share_code: str) -> Optional[Dict[str, Any]]:
         """Get a post by share code"""
-        posts = safe_query("""
-            SELECT id, user_id, kind, title, detail, share_code, created_at, status
-            FROM board_post
-            WHERE share_code = ?
-        """, (share_code,))
+        posts = safe_query(self._SQL_POST_BY_SHARE_CODE, (share_code,))
         
-        if not posts:
-            return None
-        
-        post = posts[0]
-        post['created_at'] = post['created_at'][:19]
-        return post
+        return posts[0] if posts else None
     
     def claim_post(self, post_id: str, user_id: str = None) -> Dict[str, Any]:
         """Claim a post and return mock contact information"""
@@ -152,14 +174,12 @@ class BoardManager:
         if not post or post['status'] != 'available':
             raise ValueError("Post not available for claiming")
         
-        # Select a random mock contact
-        mock_contact = random.choice(self.mock_contacts)
+        # Select a random mock contact (pre-serialized at init)
+        mock_contact, contact_json = self._contact_pairs[random.randrange(self._n_contacts)]
         
-        # Create claim record
-        safe_execute("""
-            INSERT INTO board_claim (id, post_id, user_id, mock_contact)
-            VALUES (?, ?, ?, ?)
-        """, (generate_id(), post_id, user_id or 'demo_user', str(mock_contact)))
+        # Create claim record - stored as JSON so reads can parse it back
+        safe_execute(self._SQL_INSERT_CLAIM,
+                     (generate_id(), post_id, user_id or 'demo_user', contact_json))
         
         # Update post status
         safe_execute("""
@@ -170,75 +190,44 @@ class BoardManager:
     
     def get_my_posts(self, user_id: str) -> List[Dict[str, Any]]:
         """Get posts created by a specific user"""
-        posts = safe_query("""
-            SELECT id, kind, title, detail, share_code, created_at, status
-            FROM board_post
-            WHERE user_id = ?
-            ORDER BY created_at DESC
-        """, (user_id,))
-        
-        # Format dates
-        for post in posts:
-            post['created_at'] = post['created_at'][:19]
-        
-        return posts
+        return safe_query(self._SQL_MY_POSTS, (user_id,))
     
     def get_my_claims(self, user_id: str) -> List[Dict[str, Any]]:
         """Get posts claimed by a specific user"""
-        claims = safe_query("""
-            SELECT 
-                bc.id, bc.claimed_at, bc.mock_contact,
-                bp.kind, bp.title, bp.detail, bp.share_code
-            FROM board_claim bc
-            JOIN board_post bp ON bc.post_id = bp.id
-            WHERE bc.user_id = ?
-            ORDER BY bc.claimed_at DESC
-        """, (user_id,))
+        claims = safe_query(self._SQL_MY_CLAIMS, (user_id,))
         
-        # Format dates
         for claim in claims:
-            claim['claimed_at'] = claim['claimed_at'][:19]
+            try:
+                claim['mock_contact'] = json.loads(claim['mock_contact'])
+            except ValueError:
+                pass  # Rows written before contacts were stored as JSON
         
         return claims
     
     def get_board_stats(self) -> Dict[str, int]:
-        """Get board statistics"""
-        total_posts = safe_query("SELECT COUNT(*) as count FROM board_post")
-        total_posts = total_posts[0]['count'] if total_posts else 0
-        
-        available_posts = safe_query("""
-            SELECT COUNT(*) as count FROM board_post WHERE status = 'available'
-        """)
-        available_posts = available_posts[0]['count'] if available_posts else 0
-        
-        claimed_posts = safe_query("""
-            SELECT COUNT(*) as count FROM board_post WHERE status = 'claimed'
-        """)
-        claimed_posts = claimed_posts[0]['count'] if claimed_posts else 0
-        
-        study_posts = safe_query("""
-            SELECT COUNT(*) as count FROM board_post WHERE kind = 'study'
-        """)
-        study_posts = study_posts[0]['count'] if study_posts else 0
-        
-        carpool_posts = safe_query("""
-            SELECT COUNT(*) as count FROM board_post WHERE kind = 'carpool'
+        """Get board statistics in one conditional-aggregation scan"""
+        stats = safe_query("""
+            SELECT
+                COUNT(*) as total_posts,
+                COALESCE(SUM(status = 'available'), 0) as available_posts,
+                COALESCE(SUM(status = 'claimed'), 0) as claimed_posts,
+                COALESCE(SUM(kind = 'study'), 0) as study_posts,
+                COALESCE(SUM(kind = 'carpool'), 0) as carpool_posts,
+                COALESCE(SUM(kind = 'swap'), 0) as swap_posts
+            FROM board_post
         """)
-        carpool_posts = carpool_posts[0]['count'] if carpool_posts else 0
         
-        swap_posts = safe_query("""
-            SELECT COUNT(*) as count FROM board_post WHERE kind = 'swap'
-        """)
-        swap_posts = swap_posts[0]['count'] if swap_posts else 0
+        if not stats:
+            return {
+                'total_posts': 0,
+                'available_posts': 0,
+                'claimed_posts': 0,
+                'study_posts': 0,
+                'carpool_posts': 0,
+                'swap_posts': 0
+            }
         
-        return {
-            'total_posts': total_posts,
-            'available_posts': available_posts,
-            'claimed_posts': claimed_posts,
-            'study_posts': study_posts,
-            'carpool_posts': carpool_posts,
-            'swap_posts': swap_posts
-        }
+        return dict(stats[0])
     
     def get_community_score(self, user_id: str) -> float:
         """Calculate community score based on posts and claims (0-100)"""
@@ -258,51 +247,37 @@ class BoardManager:
         return min(100, total_score)
     
     def search_posts(self, query: str) -> List[Dict[str, Any]]:
-        """Search posts by title or detail"""
-        posts = safe_query("""
-            SELECT id, user_id, kind, title, detail, share_code, created_at, status
-            FROM board_post
-            WHERE (title LIKE ? OR detail LIKE ?) AND status = 'available'
-            ORDER BY created_at DESC
-        """, (f'%{query}%', f'%{query}%'))
-        
-        # Format dates
-        for post in posts:
-            post['created_at'] = post['created_at'][:19]
-        
-        return posts
+        """Search posts by title or detail via the FTS5 index"""
+        # Quote each word so user input is treated as prefix terms rather
+        # than FTS query syntax
+        terms = ' '.join(f'"{word}"*' for word in query.replace('"', ' ').split())
+        if not terms:
+            return []
+        
+        return safe_query("""
+            SELECT bp.id, bp.user_id, bp.kind, bp.title, bp.detail, bp.share_code,
+                   substr(bp.created_at, 1, 19) as created_at, bp.status
+            FROM board_post_fts f
+            JOIN board_post bp ON bp.rowid = f.rowid
+            WHERE board_post_fts MATCH ? AND bp.status = 'available'
+            ORDER BY bp.created_at DESC
+        """, (terms,))
     
     def get_recent_activity(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get recent board activity"""
-        # Combine recent posts and claims
-        recent_posts = safe_query("""
-            SELECT 
-                'post' as type, id, kind, title, created_at, status
+        # Merge posts and claims in SQL - one query, at most `limit` rows
+        # transferred, no Python-side concat/sort/slice
+        return safe_query("""
+            SELECT
+                'post' as type, id, kind, title,
+                substr(created_at, 1, 19) as created_at, status
             FROM board_post
-            ORDER BY created_at DESC
-            LIMIT ?
-        """, (limit,))
-        
-        recent_claims = safe_query("""
-            SELECT 
-                'claim' as type, bc.id, bp.kind, bp.title, bc.claimed_at as created_at
+            UNION ALL
+            SELECT
+                'claim' as type, bc.id, bp.kind, bp.title,
+                substr(bc.claimed_at, 1, 19) as created_at, NULL as status
             FROM board_claim bc
             JOIN board_post bp ON bc.post_id = bp.id
-            ORDER BY bc.claimed_at DESC
+            ORDER BY created_at DESC
             LIMIT ?
-        """, (limit,))
-        
-        # Combine and sort by date
-        all_activity = []
-        
-        for post in recent_posts:
-            post['created_at'] = post['created_at'][:19]
-            all_activity.append(post)
-        
-        for claim in recent_claims:
-            claim['created_at'] = claim['created_at'][:19]
-            all_activity.append(claim)
-        
-        # Sort by date and return most recent
-        all_activity.sort(key=lambda x: x['created_at'], reverse=True)
-        return all_activity[:limit] 
\ No newline at end of file
+        """, (limit,)) 
\ No newline at end of file
@@ -6,20 +6,100 @@ Handles three-jar budgeting system, streaks, badges, and financial tracking
 import json
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
-from .db import safe_query, safe_execute, get_user_settings, update_user_settings
+from .db import safe_query, safe_query_rows, safe_execute, safe_execute_many, shared_connection, get_user_settings, update_user_settings
 from .utils import generate_id
 
 class BudgetManager:
     """Manages the three-jar budgeting system"""
-    
+
+    # sqlite3 keeps a per-connection compiled-statement cache keyed on the
+    # exact SQL text, so hot-path statements live here as constants instead
+    # of being rebuilt (and re-parsed) inside each method
+    _SQL_INSERT_LOG = """
+        INSERT INTO budget_log (id, user_id, amount, jar, note)
+        VALUES (?, ?, ?, ?, ?)
+    """
+    _SQL_JAR_BALANCE = """
+        SELECT COALESCE(SUM(amount), 0) as balance
+        FROM budget_log
+        WHERE user_id = ? AND jar = ?
+    """
+    _SQL_ALL_JAR_BALANCES = """
+        SELECT jar, COALESCE(SUM(amount), 0) as balance
+        FROM budget_log
+        WHERE user_id = ?
+        GROUP BY jar
+    """
+    _SQL_INSERT_EXPENSE_IF_FUNDS = """
+        INSERT INTO budget_log (id, user_id, amount, jar, note)
+        SELECT ?, ?, ?, ?, ?
+        WHERE (SELECT COALESCE(SUM(amount), 0) FROM budget_log WHERE user_id = ? AND jar = ?) >= ?
+    """
+    _SQL_BALANCES_WITH_BREAKDOWN = """
+        SELECT jar,
+               COALESCE(SUM(amount), 0) as balance,
+               COALESCE(SUM(CASE WHEN amount < 0 AND ts >= ? THEN -amount END), 0) as spent_recent
+        FROM budget_log
+        WHERE user_id = ?
+        GROUP BY jar
+    """
+    _SQL_RECENT_TXNS = """
+        SELECT ts, amount, jar, note
+        FROM budget_log
+        WHERE user_id = ?
+        ORDER BY ts DESC
+        LIMIT ?
+    """
+    _SQL_BADGE_AGGREGATES = """
+        SELECT
+            COUNT(*) as log_count,
+            COALESCE(SUM(CASE WHEN jar = 'save' THEN amount END), 0) as save_balance,
+            COALESCE(SUM(CASE WHEN jar = 'share' THEN amount END), 0) as share_balance
+        FROM budget_log
+        WHERE user_id = ?
+    """
+    _SQL_CURRENT_STREAK = """
+        WITH d AS (
+            SELECT DISTINCT DATE(ts) AS dt
+            FROM budget_log
+            WHERE user_id = ?
+        ),
+        r AS (
+            SELECT CAST(julianday(?) - julianday(dt) AS INTEGER) AS age,
+                   ROW_NUMBER() OVER (ORDER BY dt DESC) - 1 AS rn
+            FROM d
+        )
+        SELECT CASE
+            WHEN (SELECT COUNT(*) FROM r WHERE age = rn) > 0
+                THEN (SELECT COUNT(*) FROM r WHERE age = rn)
+            WHEN EXISTS (SELECT 1 FROM r WHERE rn = 0 AND age = 1) THEN 1
+            ELSE 0
+        END AS streak
+    """
+
+    # Badge definitions are static - one class-level dict shared by every
+    # instance instead of six dict allocations per BudgetManager()
+    badges = {
+        'first_log': {'name': 'First Steps', 'description': 'Logged your first transaction'},
+        'week_streak': {'name': 'Week Warrior', 'description': '7-day logging streak'},
+        'month_streak': {'name': 'Monthly Master', 'description': '30-day logging streak'},
+        'save_milestone': {'name': 'Saver', 'description': 'Saved $100 total'},
+        'share_milestone': {'name': 'Giver', 'description': 'Shared $50 total'}
+    }
+
     def __init__(self):
-        self.badges = {
-            'first_log': {'name': 'First Steps', 'description': 'Logged your first transaction'},
-            'week_streak': {'name': 'Week Warrior', 'description': '7-day logging streak'},
-            'month_streak': {'name': 'Monthly Master', 'description': '30-day logging streak'},
-            'save_milestone': {'name': 'Saver', 'description': 'Saved $100 total'},
-            'share_milestone': {'name': 'Giver', 'description': 'Shared $50 total'}
-        }
+        # Per-render memoization of the hot read paths: one page render
+        # asks for the overview and streak several times over (snapshot,
+        # badges, health score), and they only change on writes
+        self._read_cache: Dict[tuple, Any] = {}
+    
+    def reset_cache(self, user_id: Optional[str] = None):
+        """Drop memoized reads after a write (all users if None)"""
+        if user_id is None:
+            self._read_cache.clear()
+        else:
+            self._read_cache.pop(('balances', user_id), None)
+            self._read_cache.pop(('streak', user_id), None)
     
     def add_income(self, user_id: str, amount: float, note: str) -> bool:
         """Add income and distribute to jars based on user settings"""
@@ -30,142 +110,148 @@ class BudgetManager:
         save_amount = amount * (settings['save_ratio'] / 100)
         share_amount = amount * (settings['share_ratio'] / 100)
         
-        # Add to spend jar
-        safe_execute("""
-            INSERT INTO budget_log (id, user_id, amount, jar, note)
-            VALUES (?, ?, ?, 'spend', ?)
-        """, (generate_id(), user_id, spend_amount, f"Income: {note}"))
-        
-        # Add to save jar
-        safe_execute("""
-            INSERT INTO budget_log (id, user_id, amount, jar, note)
-            VALUES (?, ?, ?, 'save', ?)
-        """, (generate_id(), user_id, save_amount, f"Income: {note}"))
-        
-        # Add to share jar
-        safe_execute("""
-            INSERT INTO budget_log (id, user_id, amount, jar, note)
-            VALUES (?, ?, ?, 'share', ?)
-        """, (generate_id(), user_id, share_amount, f"Income: {note}"))
+        # All three jar rows in one executemany - a single transaction and
+        # fsync instead of three separate commits. One UUID draw with a
+        # per-jar suffix also keeps the three legs of an income trivially
+        # correlated in the log.
+        income_note = f"Income: {note}"
+        base_id = generate_id()
+        safe_execute_many(self._SQL_INSERT_LOG, [
+            (f"{base_id}-sp", user_id, spend_amount, 'spend', income_note),
+            (f"{base_id}-sv", user_id, save_amount, 'save', income_note),
+            (f"{base_id}-sh", user_id, share_amount, 'share', income_note)
+        ])
+        self.reset_cache(user_id)
         
         return True
     
+    def add_many_transactions(self, user_id: str, rows: List[Dict[str, Any]]) -> int:
+        """Insert many budget entries in one transaction (one commit total).
+
+        Each row is a dict with amount, jar, note and optionally ts.
+        Used by bulk paths like data import where per-row commits would
+        mean one fsync per transaction.
+        """
+        # One now() for the whole batch - per-row calls would both cost a
+        # syscall each and give rows from one import different timestamps
+        default_ts = datetime.now().isoformat()
+        params = [
+            (
+                generate_id(), user_id,
+                row.get('ts', default_ts),
+                row['amount'], row['jar'], row.get('note', '')
+            )
+            for row in rows
+        ]
+        inserted = safe_execute_many("""
+            INSERT INTO budget_log (id, user_id, ts, amount, jar, note)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, params)
+        self.reset_cache(user_id)
+        return inserted
+
     def add_expense(self, user_id: str, amount: float, jar: str, note: str) -> bool:
         """Add an expense to a specific jar"""
         if jar not in ['spend', 'save', 'share']:
             return False
         
-        # Check if user has enough in the jar
-        jar_balance = self.get_jar_balance(user_id, jar)
-        if jar_balance < amount:
-            return False  # Insufficient funds
+        # Balance check and insert in one atomic statement: the INSERT's
+        # SELECT only yields a row when the jar holds enough, closing the
+        # race window of the old check-then-insert pair
+        inserted = safe_execute(self._SQL_INSERT_EXPENSE_IF_FUNDS,
+                                (generate_id(), user_id, -amount, jar, note,
+                                 user_id, jar, amount))
         
-        safe_execute("""
-            INSERT INTO budget_log (id, user_id, amount, jar, note)
-            VALUES (?, ?, ?, ?, ?)
-        """, (generate_id(), user_id, -amount, jar, note))
+        if not inserted:
+            return False  # Insufficient funds
         
+        self.reset_cache(user_id)
         return True
     
     def get_budget_overview(self, user_id: str) -> Dict[str, float]:
         """Get current balance for each jar"""
-        spend_balance = self.get_jar_balance(user_id, 'spend')
-        save_balance = self.get_jar_balance(user_id, 'save')
-        share_balance = self.get_jar_balance(user_id, 'share')
-        
-        return {
-            'spend': spend_balance,
-            'save': save_balance,
-            'share': share_balance,
-            'total': spend_balance + save_balance + share_balance
-        }
+        balances = self._get_all_jar_balances(user_id)
+        balances['total'] = balances['spend'] + balances['save'] + balances['share']
+        return balances
+    
+    def _get_all_jar_balances(self, user_id: str) -> Dict[str, float]:
+        """All three jar balances from one grouped query - a single scan
+        instead of one SUM query per jar"""
+        key = ('balances', user_id)
+        if key not in self._read_cache:
+            balances = {'spend': 0.0, 'save': 0.0, 'share': 0.0}
+            for row in safe_query(self._SQL_ALL_JAR_BALANCES, (user_id,)):
+                balances[row['jar']] = float(row['balance'])
+            self._read_cache[key] = balances
+        
+        # Copy so callers (like get_budget_overview) can extend the dict
+        # without poisoning the cached entry
+        return dict(self._read_cache[key])
     
     def get_jar_balance(self, user_id: str, jar: str) -> float:
         """Get current balance for a specific jar"""
-        result = safe_query("""
-            SELECT COALESCE(SUM(amount), 0) as balance
-            FROM budget_log
-            WHERE user_id = ? AND jar = ?
-        """, (user_id, jar))
+        result = safe_query(self._SQL_JAR_BALANCE, (user_id, jar))
         
         return float(result[0]['balance']) if result else 0.0
     
-    def get_recent_transactions(self, user_id: str, limit: int = 10) -> List[Dict[str, Any]]:
-        """Get recent transactions for the user"""
-        return safe_query("""
-            SELECT ts, amount, jar, note
-            FROM budget_log
-            WHERE user_id = ?
-            ORDER BY ts DESC
-            LIMIT ?
-        """, (user_id, limit))
+    def get_recent_transactions(self, user_id: str, limit: int = 10) -> List[Any]:
+        """Get recent transactions for the user (sqlite3.Row objects)"""
+        return safe_query_rows(self._SQL_RECENT_TXNS, (user_id, limit))
     
+    def get_recent_transactions_columns(self, user_id: str, limit: int = 10) -> Dict[str, list]:
+        """Get recent transactions as columnar lists.
+
+        Skips the per-row dict materialization of safe_query so the UI can
+        hand the columns straight to a DataFrame constructor without dtype
+        inference over a list of dicts.
+        """
+        with shared_connection() as conn:
+            rows = conn.execute(self._SQL_RECENT_TXNS, (user_id, limit)).fetchall()
+
+        if not rows:
+            return {'ts': [], 'amount': [], 'jar': [], 'note': []}
+
+        ts, amount, jar, note = map(list, zip(*rows))
+        return {'ts': ts, 'amount': amount, 'jar': jar, 'note': note}
+
     def get_current_streak(self, user_id: str) -> int:
         """Calculate current logging streak in days"""
-        # Get all unique dates with transactions
-        dates = safe_query("""
-            SELECT DISTINCT DATE(ts) as log_date
-            FROM budget_log
-            WHERE user_id = ?
-            ORDER BY log_date DESC
-        """, (user_id,))
-        
-        if not dates:
-            return 0
-        
-        # Convert to date objects
-        log_dates = [datetime.strptime(row['log_date'], '%Y-%m-%d').date() for row in dates]
-        
-        # Calculate streak
-        streak = 0
-        current_date = datetime.now().date()
-        
-        for i, log_date in enumerate(log_dates):
-            if i == 0:
-                # Check if first log is today or yesterday
-                if log_date == current_date or log_date == current_date - timedelta(days=1):
-                    streak = 1
-                else:
-                    break
-            else:
-                # Check if consecutive
-                expected_date = current_date - timedelta(days=i)
-                if log_date == expected_date:
-                    streak += 1
-                else:
-                    break
-        
-        return streak
+        # The consecutive-day walk runs inside SQLite: a window function
+        # numbers the distinct dates newest-first, and a date is part of
+        # the streak exactly when its days-ago offset equals its row
+        # number. Only the final integer crosses to Python instead of one
+        # string (plus a strptime) per logged day. A streak anchored on
+        # yesterday still counts as 1, matching the old Python walk.
+        key = ('streak', user_id)
+        if key not in self._read_cache:
+            today = datetime.now().date().isoformat()
+            result = safe_query(self._SQL_CURRENT_STREAK, (user_id, today))
+            self._read_cache[key] = int(result[0]['streak']) if result else 0
+        
+        return self._read_cache[key]
     
     def get_user_badges(self, user_id: str) -> List[Dict[str, str]]:
         """Get badges earned by the user"""
         earned_badges = []
         
-        # Check first log badge
-        first_log = safe_query("""
-            SELECT COUNT(*) as count
-            FROM budget_log
-            WHERE user_id = ?
-        """, (user_id,))
+        # Log count plus save/share balances in one scan of budget_log
+        # (conditional SUMs) instead of a query per badge check
+        row = safe_query(self._SQL_BADGE_AGGREGATES, (user_id,))[0]
         
-        if first_log[0]['count'] > 0:
+        if row['log_count'] > 0:
             earned_badges.append(self.badges['first_log'])
         
-        # Check streak badges
+        # Streak badges still need the date walk
         streak = self.get_current_streak(user_id)
         if streak >= 7:
             earned_badges.append(self.badges['week_streak'])
         if streak >= 30:
             earned_badges.append(self.badges['month_streak'])
         
-        # Check save milestone
-        total_saved = self.get_jar_balance(user_id, 'save')
-        if total_saved >= 100:
+        if row['save_balance'] >= 100:
             earned_badges.append(self.badges['save_milestone'])
         
-        # Check share milestone
-        total_shared = self.get_jar_balance(user_id, 'share')
-        if total_shared >= 50:
+        if row['share_balance'] >= 50:
             earned_badges.append(self.badges['share_milestone'])
         
         return earned_badges
@@ -181,25 +267,26 @@ class BudgetManager:
     
     def get_weekly_spending(self, user_id: str, weeks: int = 4) -> List[Dict[str, Any]]:
         """Get weekly spending data for charts"""
-        weekly_data = []
-        
-        for i in range(weeks):
-            week_start = datetime.now() - timedelta(weeks=i+1)
-            week_end = datetime.now() - timedelta(weeks=i)
-            
-            result = safe_query("""
-                SELECT 
-                    jar,
-                    COALESCE(SUM(CASE WHEN amount > 0 THEN amount ELSE 0 END), 0) as income,
-                    COALESCE(SUM(CASE WHEN amount < 0 THEN ABS(amount) ELSE 0 END), 0) as expenses
-                FROM budget_log
-                WHERE user_id = ? 
-                AND ts >= ? 
-                AND ts < ?
-                GROUP BY jar
-            """, (user_id, week_start.isoformat(), week_end.isoformat()))
-            
-            week_data = {
+        now = datetime.now()
+        
+        # Bucket by weeks-ago offset in SQL so the whole chart is one scan
+        # instead of a grouped query (and round trip) per week
+        result = safe_query_rows("""
+            SELECT 
+                CAST((julianday(?) - julianday(ts)) / 7 AS INTEGER) as week_idx,
+                jar,
+                COALESCE(SUM(CASE WHEN amount > 0 THEN amount ELSE 0 END), 0) as income,
+                COALESCE(SUM(CASE WHEN amount < 0 THEN ABS(amount) ELSE 0 END), 0) as expenses
+            FROM budget_log
+            WHERE user_id = ? 
+            AND ts >= ? 
+            AND ts < ?
+            GROUP BY week_idx, jar
+        """, (now.isoformat(), user_id,
+              (now - timedelta(weeks=weeks)).isoformat(), now.isoformat()))
+        
+        weekly_data = [
+            {
                 'week': f"Week {weeks-i}",
                 'spend_income': 0,
                 'spend_expenses': 0,
@@ -208,13 +295,15 @@ class BudgetManager:
                 'share_income': 0,
                 'share_expenses': 0
             }
-            
-            for row in result:
+            for i in range(weeks)
+        ]
+        
+        for row in result:
+            week_idx = row['week_idx']
+            if 0 <= week_idx < weeks:
                 jar = row['jar']
-                week_data[f'{jar}_income'] = float(row['income'])
-                week_data[f'{jar}_expenses'] = float(row['expenses'])
-            
-            weekly_data.append(week_data)
+                weekly_data[week_idx][f'{jar}_income'] = float(row['income'])
+                weekly_data[week_idx][f'{jar}_expenses'] = float(row['expenses'])
         
         return weekly_data
     
@@ -222,7 +311,7 @@ class BudgetManager:
         """Get spending breakdown by category for the last N days"""
         since_date = datetime.now() - timedelta(days=days)
         
-        result = safe_query("""
+        result = safe_query_rows("""
             SELECT 
                 jar,
                 COALESCE(SUM(CASE WHEN amount < 0 THEN ABS(amount) ELSE 0 END), 0) as total_spent
@@ -240,11 +329,52 @@ class BudgetManager:
         
         return breakdown
     
+    def get_budget_snapshot(self, user_id: str, breakdown_days: int = 30) -> Dict[str, Any]:
+        """Get overview, spending breakdown, streak, and health score.
+
+        Callers that need several of these (like the Autonomy Index and
+        the dashboard) would otherwise re-scan budget_log once per
+        metric. One grouped scan yields both the jar balances and the
+        recent spending breakdown; the streak CTE is the only other
+        query.
+        """
+        since = (datetime.now() - timedelta(days=breakdown_days)).isoformat()
+        
+        balances = {'spend': 0.0, 'save': 0.0, 'share': 0.0}
+        breakdown = {'spend': 0.0, 'save': 0.0, 'share': 0.0}
+        for row in safe_query(self._SQL_BALANCES_WITH_BREAKDOWN, (since, user_id)):
+            balances[row['jar']] = float(row['balance'])
+            breakdown[row['jar']] = float(row['spent_recent'])
+        
+        # The fused scan just produced the balances - seed the memo so a
+        # later get_budget_overview call in the same render is free
+        self._read_cache[('balances', user_id)] = dict(balances)
+        
+        overview = dict(balances)
+        overview['total'] = balances['spend'] + balances['save'] + balances['share']
+        streak = self.get_current_streak(user_id)
+        
+        return {
+            'overview': overview,
+            'breakdown': breakdown,
+            'streak': streak,
+            'health_score': self._health_from_parts(overview, streak)
+        }
+
     def get_financial_health_score(self, user_id: str) -> float:
         """Calculate financial health score (0-100)"""
         overview = self.get_budget_overview(user_id)
-        streak = self.get_current_streak(user_id)
         
+        # Nothing logged yet - the score is 0 regardless of streak, so
+        # don't pay for the streak query (fresh users hit this a lot)
+        if overview['total'] == 0:
+            return 0.0
+        
+        streak = self.get_current_streak(user_id)
+        return self._health_from_parts(overview, streak)
+
+    def _health_from_parts(self, overview: Dict[str, float], streak: int) -> float:
+        """Health score from an already-fetched overview and streak"""
         # Base score from savings ratio
         total = overview['total']
         if total == 0:
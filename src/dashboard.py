@@ -0,0 +1,168 @@
+"""
+Dashboard module for IndiePilot
+Builds the dashboard snapshot in a single database round trip
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+
+from .db import shared_connection
+from .indiegraph import IndieGraph
+
+# Mirrors the user_settings defaults from db.get_user_settings
+DEFAULT_SETTINGS = {
+    'spend_ratio': 60.0,
+    'save_ratio': 30.0,
+    'share_ratio': 10.0,
+    'skills_weight': 0.30,
+    'budgeting_weight': 0.30,
+    'community_weight': 0.15,
+    'judgment_weight': 0.25
+}
+
+
+def get_dashboard_snapshot(user_id: str, indiegraph: Optional[IndieGraph] = None) -> Dict[str, Any]:
+    """
+    Compute everything the Dashboard tab needs on one connection.
+
+    The tab previously issued five independent manager calls, each opening
+    its own SQLite connection (autonomy index, streak, recommendations,
+    plus the radar's internal queries). This runs all the SELECTs in a
+    single transaction and derives the scores in Python, so a dashboard
+    render costs one connection instead of five.
+
+    Returns a dict with:
+        score         - weighted Autonomy Index (0-100)
+        streak        - current logging streak in days
+        radar_values  - per-area scores for the radar chart
+        recommendations - next-skill suggestions from IndieGraph
+    """
+    with shared_connection() as conn:
+        # User settings (weights) - fall back to defaults if not created yet
+        settings_row = conn.execute(
+            "SELECT * FROM user_settings WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        settings = dict(settings_row) if settings_row else dict(DEFAULT_SETTINGS)
+
+        # Completed quests - feeds both the skills score and IndieGraph recs
+        completed_rows = conn.execute("""
+            SELECT quest_id FROM quest_progress
+            WHERE user_id = ? AND completed_at IS NOT NULL
+        """, (user_id,)).fetchall()
+        completed_skills = {row['quest_id'] for row in completed_rows}
+
+        # Jar balances in one grouped query
+        jar_rows = conn.execute("""
+            SELECT jar, COALESCE(SUM(amount), 0) as balance
+            FROM budget_log
+            WHERE user_id = ?
+            GROUP BY jar
+        """, (user_id,)).fetchall()
+        balances = {'spend': 0.0, 'save': 0.0, 'share': 0.0}
+        for row in jar_rows:
+            balances[row['jar']] = float(row['balance'])
+
+        # Distinct logging dates for the streak walk
+        date_rows = conn.execute("""
+            SELECT DISTINCT DATE(ts) as log_date
+            FROM budget_log
+            WHERE user_id = ?
+            ORDER BY log_date DESC
+        """, (user_id,)).fetchall()
+        log_dates = [
+            datetime.strptime(row['log_date'], '%Y-%m-%d').date()
+            for row in date_rows
+        ]
+
+        # Board activity counts as scalar subqueries in one statement
+        board_row = conn.execute("""
+            SELECT
+                (SELECT COUNT(*) FROM board_post WHERE user_id = ?) as posts,
+                (SELECT COUNT(*) FROM board_claim WHERE user_id = ?) as claims
+        """, (user_id, user_id)).fetchone()
+
+        # Average of the last 5 sim scores
+        judgment_row = conn.execute("""
+            SELECT AVG(score) as avg_score FROM (
+                SELECT score FROM sim_run
+                WHERE user_id = ?
+                ORDER BY ran_at DESC
+                LIMIT 5
+            )
+        """, (user_id,)).fetchone()
+
+    streak = _streak_from_dates(log_dates)
+
+    # Same scoring formulas as AutonomyIndex, computed from fetched rows
+    skills_score = min(100, len(completed_skills) * 10)
+    budgeting_score = _budgeting_score(balances, streak)
+    community_score = min(100, min(50, board_row['posts'] * 5) + min(50, board_row['claims'] * 10))
+    judgment_score = float(judgment_row['avg_score']) if judgment_row['avg_score'] is not None else 50.0
+
+    radar_values = {
+        'skills': skills_score,
+        'budgeting': budgeting_score,
+        'community': community_score,
+        'judgment': judgment_score
+    }
+
+    score = (
+        skills_score * settings['skills_weight'] +
+        budgeting_score * settings['budgeting_weight'] +
+        community_score * settings['community_weight'] +
+        judgment_score * settings['judgment_weight']
+    )
+
+    graph = indiegraph or IndieGraph()
+    recommendations = graph.recommend_from_completed(completed_skills)
+
+    return {
+        'score': round(score, 1),
+        'streak': streak,
+        'radar_values': radar_values,
+        'recommendations': recommendations
+    }
+
+
+def _streak_from_dates(log_dates) -> int:
+    """Count the current logging streak from the distinct log dates.
+
+    Walks backwards from today with O(1) set lookups, so the loop runs
+    streak-many iterations instead of touching every date the user has
+    ever logged. Matches BudgetManager.get_current_streak: a streak
+    anchored only on yesterday counts as 1.
+    """
+    dates_set = set(log_dates)
+    today = datetime.now().date()
+
+    if today not in dates_set:
+        return 1 if today - timedelta(days=1) in dates_set else 0
+
+    streak = 0
+    day = today
+    while day in dates_set:
+        streak += 1
+        day -= timedelta(days=1)
+
+    return streak
+
+
+def _budgeting_score(balances: Dict[str, float], streak: int) -> float:
+    """Budgeting score from jar balances and streak (0-100)"""
+    total = balances['spend'] + balances['save'] + balances['share']
+
+    if total == 0:
+        base_score = 0.0
+        overspend_penalty = 0.0
+    else:
+        savings_ratio = balances['save'] / total
+        savings_score = min(100, savings_ratio * 200)
+        spend_ratio = balances['spend'] / total
+        spending_score = max(0, 30 - (spend_ratio * 30))
+        base_score = savings_score + min(20, streak * 2) + spending_score
+        base_score = min(100, base_score)
+        overspend_penalty = max(0, (spend_ratio - 0.7) * 100)
+
+    streak_bonus = min(20, streak * 2)
+    final_score = base_score + streak_bonus - overspend_penalty
+    return max(0, min(100, final_score))
@@ -6,18 +6,78 @@ Handles SQLite database initialization, connections, and seeding
 import sqlite3
 import json
 import os
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Any, Optional
-from datetime import datetime
 
 # Database file path
 DB_PATH = "indiepilot.db"
 
-def get_db_connection() -> sqlite3.Connection:
-    """Get a database connection with proper configuration"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row  # Enable dict-like access to rows
-    return conn
+# One long-lived connection shared by every manager. Opening a connection
+# per query re-applies PRAGMAs, throws away SQLite's page and statement
+# caches, and costs a round of syscalls each time. Streamlit may touch it
+# from different script threads, so access is serialized with a lock.
+# (A single connection also supersedes SQLite's shared-cache URI mode:
+# there is only one page cache to share, and WAL already covers the
+# reader/writer concurrency shared cache was meant to help with.)
+_shared_conn: Optional[sqlite3.Connection] = None
+_conn_lock = threading.RLock()
+
+def get_shared_connection() -> sqlite3.Connection:
+    """Get (lazily creating) the process-wide shared connection"""
+    global _shared_conn
+    with _conn_lock:
+        if _shared_conn is None:
+            # cached_statements sizes sqlite3's per-connection compiled-
+            # statement cache (keyed on exact SQL text); the app's hot
+            # queries are module constants so they hit this cache
+            _shared_conn = sqlite3.connect(DB_PATH, check_same_thread=False,
+                                           cached_statements=256)
+            _shared_conn.row_factory = sqlite3.Row
+            _apply_pragmas(_shared_conn)
+        return _shared_conn
+
+@contextmanager
+def shared_connection():
+    """Yield the shared connection while holding its lock"""
+    with _conn_lock:
+        yield get_shared_connection()
+
+@contextmanager
+def transaction():
+    """Yield the shared connection inside one explicit transaction.
+
+    Bulk writers group many statements under a single BEGIN/COMMIT, so
+    the batch pays one fsync instead of one per statement and rolls back
+    as a unit on failure.
+    """
+    with _conn_lock:
+        conn = get_shared_connection()
+        try:
+            conn.execute("BEGIN")
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+def _apply_pragmas(conn: sqlite3.Connection):
+    """
+    Tune the connection for an interactive app.
+
+    WAL lets Streamlit's readers and writers proceed concurrently instead of
+    blocking each other, and synchronous=NORMAL is durable under WAL while
+    skipping the per-commit fsync of the default FULL mode. The rest keeps
+    temp data and hot pages in memory and waits out brief lock contention.
+    """
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA cache_size=-20000")  # ~20MB page cache
+    conn.execute("PRAGMA busy_timeout=5000")
 
 def init_db():
     """Initialize the database with schema"""
@@ -29,38 +89,41 @@ def init_db():
     with open(schema_path, 'r', encoding='utf-8') as f:
         schema_sql = f.read()
     
-    conn = get_db_connection()
-    try:
+    with shared_connection() as conn:
         conn.executescript(schema_sql)
         conn.commit()
-    finally:
-        conn.close()
 
 def seed_database():
     """Seed the database with initial data"""
-    conn = get_db_connection()
-    try:
-        # Check if already seeded
+    with shared_connection() as conn:
+        # Check the idempotency marker first - one indexed lookup instead of
+        # re-running (or worse, re-applying) the seed on every cold start
+        cursor = conn.execute("SELECT 1 FROM meta WHERE key = 'seeded' LIMIT 1")
+        if cursor.fetchone():
+            return  # Already seeded
+
+        # Databases created before the meta table just need the marker
         cursor = conn.execute("SELECT COUNT(*) FROM quest")
         if cursor.fetchone()[0] > 0:
-            return  # Already seeded
-        
-        # Seed quests
-        seed_quests(conn)
-        
-        # Seed scenarios (stored in JSON for now)
-        # Scenarios are loaded dynamically from JSON files
-        
-        # Seed board posts
-        seed_board_posts(conn)
-        
-        # Seed IndieGraph data
-        # Graph data is loaded dynamically from JSON files
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('seeded', 1)")
+            return
         
-        conn.commit()
-        
-    finally:
-        conn.close()
+        # One transaction (and one fsync) around all the seed batches
+        with conn:
+            # Seed quests
+            seed_quests(conn)
+            
+            # Seed scenarios (stored in JSON for now)
+            # Scenarios are loaded dynamically from JSON files
+            
+            # Seed board posts
+            seed_board_posts(conn)
+            
+            # Seed IndieGraph data
+            # Graph data is loaded dynamically from JSON files
+            
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('seeded', 1)")
 
 def seed_quests(conn: sqlite3.Connection):
     """Seed quest data"""
@@ -175,14 +238,18 @@ def seed_quests(conn: sqlite3.Connection):
         }
     ]
     
-    for quest in quests_data:
-        conn.execute("""
-            INSERT OR REPLACE INTO quest (id, title, description, difficulty, xp, est_minutes, materials)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
-            quest['id'], quest['title'], quest['description'], 
+    # One executemany inside the caller's transaction instead of a
+    # statement (and fsync) per row
+    conn.executemany("""
+        INSERT OR REPLACE INTO quest (id, title, description, difficulty, xp, est_minutes, materials)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, [
+        (
+            quest['id'], quest['title'], quest['description'],
             quest['difficulty'], quest['xp'], quest['est_minutes'], quest['materials']
-        ))
+        )
+        for quest in quests_data
+    ])
 
 def seed_board_posts(conn: sqlite3.Connection):
     """Seed sample board posts"""
@@ -213,78 +280,90 @@ def seed_board_posts(conn: sqlite3.Connection):
         }
     ]
     
-    for post in posts_data:
-        conn.execute("""
-            INSERT OR REPLACE INTO board_post (id, user_id, kind, title, detail, share_code)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (
-            post['id'], post['user_id'], post['kind'], 
+    conn.executemany("""
+        INSERT OR REPLACE INTO board_post (id, user_id, kind, title, detail, share_code)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, [
+        (
+            post['id'], post['user_id'], post['kind'],
             post['title'], post['detail'], post['share_code']
-        ))
+        )
+        for post in posts_data
+    ])
 
 def safe_query(query: str, params: tuple = ()) -> List[Dict[str, Any]]:
     """Execute a safe parameterized query and return results as list of dicts"""
-    conn = get_db_connection()
-    try:
+    with shared_connection() as conn:
         cursor = conn.execute(query, params)
         return [dict(row) for row in cursor.fetchall()]
-    finally:
-        conn.close()
+
+def safe_query_rows(query: str, params: tuple = ()) -> List[sqlite3.Row]:
+    """Like safe_query, but returns the sqlite3.Row objects directly.
+
+    Row already supports row['column'] access, so read-only callers can
+    skip the per-row dict copy safe_query pays.
+    """
+    with shared_connection() as conn:
+        return conn.execute(query, params).fetchall()
 
 def safe_execute(query: str, params: tuple = ()) -> int:
     """Execute a safe parameterized query and return number of affected rows"""
-    conn = get_db_connection()
-    try:
+    with shared_connection() as conn:
         cursor = conn.execute(query, params)
         conn.commit()
         return cursor.rowcount
-    finally:
-        conn.close()
 
 def safe_execute_many(query: str, params_list: List[tuple]) -> int:
     """Execute multiple safe parameterized queries"""
-    conn = get_db_connection()
-    try:
+    with shared_connection() as conn:
         cursor = conn.executemany(query, params_list)
         conn.commit()
         return cursor.rowcount
-    finally:
-        conn.close()
 
 def get_user_or_create(user_id: str, name: str = "Teen Explorer") -> Dict[str, Any]:
     """Get user or create if doesn't exist"""
-    users = safe_query("SELECT * FROM user WHERE id = ?", (user_id,))
-    
-    if not users:
-        safe_execute("INSERT INTO user (id, name) VALUES (?, ?)", (user_id, name))
-        return {'id': user_id, 'name': name, 'created_at': datetime.now().isoformat()}
+    # Upsert instead of SELECT-then-INSERT: atomic, and the existing-user
+    # path is a conflict no-op rather than a second round trip
+    with shared_connection() as conn:
+        conn.execute(
+            "INSERT INTO user (id, name) VALUES (?, ?) ON CONFLICT(id) DO NOTHING",
+            (user_id, name)
+        )
+        # Commit even when the conflict made this a no-op: the DML still
+        # opened an implicit transaction, which would make a later
+        # explicit BEGIN fail
+        conn.commit()
+        row = conn.execute("SELECT * FROM user WHERE id = ?", (user_id,)).fetchone()
     
-    return dict(users[0])
+    return dict(row)
 
 def get_user_settings(user_id: str) -> Dict[str, Any]:
     """Get user settings or create defaults"""
-    settings = safe_query("SELECT * FROM user_settings WHERE user_id = ?", (user_id,))
-    
-    if not settings:
-        # Create default settings
-        safe_execute("""
-            INSERT INTO user_settings (user_id, spend_ratio, save_ratio, share_ratio,
-                                     skills_weight, budgeting_weight, community_weight, judgment_weight)
-            VALUES (?, 60.0, 30.0, 10.0, 0.30, 0.30, 0.15, 0.25)
-        """, (user_id,))
-        
-        return {
-            'user_id': user_id,
-            'spend_ratio': 60.0,
-            'save_ratio': 30.0,
-            'share_ratio': 10.0,
-            'skills_weight': 0.30,
-            'budgeting_weight': 0.30,
-            'community_weight': 0.15,
-            'judgment_weight': 0.25
-        }
+    # Upsert relying on the schema's column defaults (60/30/10 ratios,
+    # 0.30/0.30/0.15/0.25 weights) - existing rows are a conflict no-op
+    with shared_connection() as conn:
+        conn.execute(
+            "INSERT INTO user_settings (user_id) VALUES (?) ON CONFLICT(user_id) DO NOTHING",
+            (user_id,)
+        )
+        # Unconditional for the same reason as get_user_or_create: a no-op
+        # upsert still leaves an implicit transaction open
+        conn.commit()
+        row = conn.execute("SELECT * FROM user_settings WHERE user_id = ?", (user_id,)).fetchone()
     
-    return dict(settings[0])
+    return dict(row)
+
+@lru_cache(maxsize=32)
+def _settings_update_sql(fields: tuple) -> str:
+    """Build (once per field combination) the settings UPDATE statement.
+
+    The app only ever updates a couple of field combinations, so caching
+    by the sorted field tuple means the SQL text is a stable string and
+    the connection's statement cache gets hits instead of re-preparing a
+    freshly built f-string every call.
+    """
+    assignments = ', '.join(f"{field} = ?" for field in fields)
+    return f"UPDATE user_settings SET {assignments} WHERE user_id = ?"
 
 def update_user_settings(user_id: str, **kwargs) -> bool:
     """Update user settings"""
@@ -293,18 +372,11 @@ def update_user_settings(user_id: str, **kwargs) -> bool:
         'skills_weight', 'budgeting_weight', 'community_weight', 'judgment_weight'
     }
     
-    updates = []
-    params = []
-    
-    for key, value in kwargs.items():
-        if key in valid_fields:
-            updates.append(f"{key} = ?")
-            params.append(value)
+    fields = tuple(sorted(key for key in kwargs if key in valid_fields))
     
-    if not updates:
+    if not fields:
         return False
     
-    params.append(user_id)
-    query = f"UPDATE user_settings SET {', '.join(updates)} WHERE user_id = ?"
+    params = tuple(kwargs[field] for field in fields) + (user_id,)
     
-    return safe_execute(query, tuple(params)) > 0 
\ No newline at end of file
+    return safe_execute(_settings_update_sql(fields), params) > 0
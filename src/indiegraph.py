@@ -3,12 +3,31 @@ IndieGraph module for IndiePilot
 Handles skill dependency graph and next-best-skill recommendations
 """
 
+import heapq
 import json
-from typing import Dict, List, Any, Optional, Set
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Set, Tuple
 from .db import safe_query
 
 class IndieGraph:
     """Manages the skill dependency graph and recommendations"""
+
+    # Constant SQL text so sqlite3's per-connection statement cache can
+    # reuse the compiled statements on these hot paths
+    _SQL_COMPLETED_IDS = """
+        SELECT q.id
+        FROM quest_progress qp
+        JOIN quest q ON qp.quest_id = q.id
+        WHERE qp.user_id = ? AND qp.completed_at IS NOT NULL
+    """
+    _SQL_COMPLETED_BY_DIFFICULTY = """
+        SELECT q.difficulty, COUNT(*) as count, GROUP_CONCAT(q.id) as quest_ids
+        FROM quest_progress qp
+        JOIN quest q ON qp.quest_id = q.id
+        WHERE qp.user_id = ? AND qp.completed_at IS NOT NULL
+        GROUP BY q.difficulty
+    """
     
     def __init__(self):
         # Load the skill dependency graph
@@ -19,6 +38,80 @@ class IndieGraph:
         # Build adjacency lists for efficient traversal
         self.adjacency_list = self._build_adjacency_list()
         self.reverse_adjacency = self._build_reverse_adjacency()
+        
+        # O(1) lookup structures - the graph is static, so build once here
+        # instead of scanning self.nodes on every get_node_by_id call
+        self.node_index = {node['id']: node for node in self.nodes}
+        self._prereq_tuples = {
+            node['id']: tuple(node.get('prerequisites', ()))
+            for node in self.nodes
+        }
+        
+        # Centrality depends only on graph shape, and the root-node
+        # fallback list never changes - compute both once
+        self.centrality = {
+            node_id: len(self.adjacency_list[node_id]) - len(self.reverse_adjacency[node_id])
+            for node_id in self.adjacency_list
+        }
+        self.root_nodes = [node for node in self.nodes if not node['prerequisites']]
+        
+        # Bitmask encoding: each node gets one bit, so a set of completed
+        # skills packs into a single int and a prerequisite check becomes
+        # one AND instead of per-element set membership tests
+        self.node_bit = {node['id']: 1 << i for i, node in enumerate(self.nodes)}
+        self.prereq_mask = {
+            node['id']: self._mask(node.get('prerequisites', []))
+            for node in self.nodes
+        }
+        
+        # Integer-indexed adjacency (CSR-lite): hot loops walk small int
+        # lists and index flat arrays instead of hashing string ids; the
+        # string id only appears at the API boundary. Node i's bit in a
+        # completed mask is simply 1 << i.
+        self.idx = {node['id']: i for i, node in enumerate(self.nodes)}
+        self.adj_i: List[List[int]] = [[] for _ in self.nodes]
+        self.radj_i: List[List[int]] = [[] for _ in self.nodes]
+        for edge in self.edges:
+            from_i = self.idx.get(edge['from'])
+            to_i = self.idx.get(edge['to'])
+            if from_i is not None and to_i is not None:
+                self.adj_i[from_i].append(to_i)
+                self.radj_i[to_i].append(from_i)
+        self.prereq_bits_i = [self.prereq_mask[node['id']] for node in self.nodes]
+        
+        # Topological order (Kahn's algorithm). The skill graph is a DAG,
+        # so one linear sweep in this order visits every prerequisite
+        # before its dependents - the natural order for availability
+        # sweeps and future path/XP estimations.
+        self._topo_i = self._topological_order_i()
+        self.topo_order = [self.nodes[i]['id'] for i in self._topo_i]
+        
+        # Static portion of the skill-tree view: every call returns the
+        # same nodes and centrality values, only the completed/available
+        # flags vary per user
+        self._tree_template = [
+            dict(node, centrality=self.centrality[node['id']])
+            for node in self.nodes
+        ]
+        
+        # Lowercased search fields, computed once - search_skills runs per
+        # keystroke in a typeahead and shouldn't re-lower every string
+        self._search_index = [
+            (node, (node['title'].lower(), node['description'].lower(), node['category'].lower()))
+            for node in self.nodes
+        ]
+        
+        # Recommendation ranking is a pure function of the completed set,
+        # and dashboards re-request it with the same set many times per
+        # session. Per-instance cache so instances don't pin each other.
+        self._rank_cached = lru_cache(maxsize=128)(self._rank)
+    
+    def _mask(self, skill_ids) -> int:
+        """Pack a collection of skill ids into a bitmask (unknown ids are ignored)"""
+        mask = 0
+        for skill_id in skill_ids:
+            mask |= self.node_bit.get(skill_id, 0)
+        return mask
     
     def _load_indiegraph(self) -> Dict[str, Any]:
         """Load the skill dependency graph from embedded data"""
@@ -174,6 +267,22 @@ class IndieGraph:
         
         return adjacency
     
+    def _topological_order_i(self) -> List[int]:
+        """Order node indices so every prerequisite precedes its dependents"""
+        indegree = [len(prereqs) for prereqs in self.radj_i]
+        queue = deque(i for i, degree in enumerate(indegree) if degree == 0)
+        order = []
+        
+        while queue:
+            i = queue.popleft()
+            order.append(i)
+            for dependent in self.adj_i[i]:
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    queue.append(dependent)
+        
+        return order
+    
     def _build_reverse_adjacency(self) -> Dict[str, List[str]]:
         """Build reverse adjacency list for backward traversal"""
         reverse = {node['id']: [] for node in self.nodes}
@@ -186,18 +295,15 @@ class IndieGraph:
     
     def get_node_by_id(self, node_id: str) -> Optional[Dict[str, Any]]:
         """Get a node by its ID"""
-        for node in self.nodes:
-            if node['id'] == node_id:
-                return node
-        return None
+        return self.node_index.get(node_id)
     
-    def get_prerequisites(self, skill_id: str) -> List[str]:
-        """Get all prerequisites for a skill"""
-        node = self.get_node_by_id(skill_id)
-        if not node:
-            return []
-        
-        return node.get('prerequisites', [])
+    def get_prerequisites(self, skill_id: str) -> Tuple[str, ...]:
+        """Get all prerequisites for a skill.
+
+        Returned as an interned immutable tuple: hashable for downstream
+        caching and safe to hand out without a defensive copy.
+        """
+        return self._prereq_tuples.get(skill_id, ())
     
     def get_dependents(self, skill_id: str) -> List[str]:
         """Get all skills that depend on this skill"""
@@ -205,18 +311,20 @@ class IndieGraph:
     
     def is_available(self, skill_id: str, completed_skills: Set[str]) -> bool:
         """Check if a skill is available given completed skills"""
-        prerequisites = self.get_prerequisites(skill_id)
-        return all(prereq in completed_skills for prereq in prerequisites)
+        # Prereqs satisfied iff no prereq bit falls outside the completed mask
+        return self.prereq_mask.get(skill_id, 0) & ~self._mask(completed_skills) == 0
     
     def get_available_skills(self, completed_skills: Set[str]) -> List[Dict[str, Any]]:
-        """Get all skills that are available to learn"""
-        available = []
-        
-        for node in self.nodes:
-            if node['id'] not in completed_skills and self.is_available(node['id'], completed_skills):
-                available.append(node)
-        
-        return available
+        """Get all skills that are available to learn, in dependency order"""
+        # One linear sweep in topological order with a single precomputed
+        # mask - roots come back first, deeper skills after their prereqs
+        completed_mask = self._mask(completed_skills)
+        return [
+            self.nodes[i]
+            for i in self._topo_i
+            if (not (completed_mask >> i) & 1 and
+                self.prereq_bits_i[i] & ~completed_mask == 0)
+        ]
     
     def calculate_centrality(self, skill_id: str) -> float:
         """
@@ -225,32 +333,36 @@ class IndieGraph:
         - Number of skills this skill depends on (in-degree)
         - Higher centrality = more important in the skill tree
         """
-        dependents = len(self.get_dependents(skill_id))
-        prerequisites = len(self.get_prerequisites(skill_id))
-        
-        # Centrality = out-degree - in-degree (favors skills that unlock many others)
-        centrality = dependents - prerequisites
-        
-        return centrality
+        # Precomputed in __init__ - the graph never changes at runtime
+        return self.centrality.get(skill_id, 0)
     
     def calculate_coverage(self, skill_id: str, completed_skills: Set[str]) -> float:
         """
         Calculate coverage score for a skill:
         - How many new skills would be unlocked by completing this skill
         - Higher coverage = more immediate impact
+        
+        Runs in O(out-degree): only direct dependents of skill_id can
+        change availability, so nothing else needs checking.
         """
         if skill_id in completed_skills:
             return 0.0
         
-        # Get skills that would become available
-        potential_skills = set()
-        for node in self.nodes:
-            if (node['id'] not in completed_skills and 
-                node['id'] != skill_id and
-                self.is_available(node['id'], completed_skills | {skill_id})):
-                potential_skills.add(node['id'])
-        
-        return len(potential_skills)
+        # Only direct dependents can change availability, so check those
+        # instead of rescanning every node - O(out-degree) not O(V)
+        i = self.idx.get(skill_id)
+        if i is None:
+            return 0
+        
+        base_mask = self._mask(completed_skills)
+        after_mask = base_mask | (1 << i)
+        unlocked = 0
+        for dependent in self.adj_i[i]:
+            if (not (base_mask >> dependent) & 1 and
+                    self.prereq_bits_i[dependent] & ~after_mask == 0):
+                unlocked += 1
+        
+        return unlocked
     
     def get_next_skills(self, user_id: str, limit: int = 3) -> List[Dict[str, Any]]:
         """
@@ -264,103 +376,160 @@ class IndieGraph:
         5. Return top recommendations
         """
         # Get user's completed skills
-        completed_quests = safe_query("""
-            SELECT q.id
-            FROM quest_progress qp
-            JOIN quest q ON qp.quest_id = q.id
-            WHERE qp.user_id = ? AND qp.completed_at IS NOT NULL
-        """, (user_id,))
+        completed_quests = safe_query(self._SQL_COMPLETED_IDS, (user_id,))
         
         completed_skills = {row['id'] for row in completed_quests}
-        
+
+        return self.recommend_from_completed(completed_skills, limit)
+
+    def recommend_from_completed(self, completed_skills: Set[str], limit: int = 3) -> List[Dict[str, Any]]:
+        """Rank recommendations from an already-fetched completed-skill set (no DB access)"""
+        # frozenset is hashable, so the ranked result can be memoized on it
+        return list(self._rank_cached(frozenset(completed_skills), limit))
+    
+    def _rank(self, completed_skills: frozenset, limit: int) -> List[Dict[str, Any]]:
+        """Score and rank available skills (cached via self._rank_cached)"""
         # Get available skills
         available_skills = self.get_available_skills(completed_skills)
         
         if not available_skills:
             # If no skills are available, recommend basic skills
-            return [node for node in self.nodes if not node['prerequisites']][:limit]
+            return self.root_nodes[:limit]
         
-        # Calculate scores for each available skill
-        scored_skills = []
-        for skill in available_skills:
-            centrality = self.calculate_centrality(skill['id'])
-            coverage = self.calculate_coverage(skill['id'], completed_skills)
-            
-            # Combined score (can be adjusted based on preference)
-            combined_score = centrality + coverage
-            
-            scored_skills.append({
+        # Score each available skill and keep only the top `limit` with a
+        # bounded heap - O(V log limit) instead of sorting all candidates
+        scored_skills = (
+            {
                 **skill,
                 'centrality': centrality,
                 'coverage': coverage,
-                'combined_score': combined_score
-            })
-        
-        # Sort by combined score (descending)
-        scored_skills.sort(key=lambda x: x['combined_score'], reverse=True)
+                'combined_score': centrality + coverage
+            }
+            for skill in available_skills
+            for centrality in (self.centrality[skill['id']],)
+            for coverage in (self.calculate_coverage(skill['id'], completed_skills),)
+        )
         
-        # Return top recommendations
-        return scored_skills[:limit]
+        return heapq.nlargest(limit, scored_skills, key=lambda x: x['combined_score'])
     
     def get_skill_path(self, target_skill_id: str, completed_skills: Set[str]) -> List[Dict[str, Any]]:
         """Get the optimal path to learn a target skill"""
         if target_skill_id in completed_skills:
             return []
         
-        # Use breadth-first search to find shortest path
-        queue = [(target_skill_id, [])]
-        visited = set()
+        completed_mask = self._mask(completed_skills)
         
-        while queue:
-            current_skill, path = queue.pop(0)
-            
-            if current_skill in visited:
-                continue
-            
-            visited.add(current_skill)
-            
-            # Check if this skill is available
-            if self.is_available(current_skill, completed_skills):
-                return path + [self.get_node_by_id(current_skill)]
+        # Already learnable - the path is just the target itself
+        if self.prereq_mask.get(target_skill_id, 0) & ~completed_mask == 0:
+            return [self.get_node_by_id(target_skill_id)]
+        
+        # Bidirectional BFS: walk backward from the target through unmet
+        # prerequisites and forward from the currently-available skills
+        # through dependents, always expanding the smaller frontier.
+        # Visits O(b^(d/2)) nodes instead of O(b^d) for a one-sided search.
+        back_parent = {target_skill_id: None}
+        fwd_parent = {}
+        for node in self.nodes:
+            node_id = node['id']
+            if node_id not in completed_skills and self.prereq_mask[node_id] & ~completed_mask == 0:
+                fwd_parent[node_id] = None
+        
+        back_frontier = {target_skill_id}
+        fwd_frontier = set(fwd_parent)
+        
+        while back_frontier and fwd_frontier:
+            common = back_parent.keys() & fwd_parent.keys()
+            if common:
+                # Stitch the two half-paths at the meeting node:
+                # target -> ... -> meet via back_parent, then
+                # meet -> ... -> available start via fwd_parent
+                meet = common.pop()
+                path = []
+                skill = meet
+                while skill is not None:
+                    path.append(skill)
+                    skill = back_parent[skill]
+                path.reverse()
+                skill = fwd_parent[meet]
+                while skill is not None:
+                    path.append(skill)
+                    skill = fwd_parent[skill]
+                return [self.get_node_by_id(skill) for skill in path]
             
-            # Add prerequisites to queue
-            prerequisites = self.get_prerequisites(current_skill)
-            for prereq in prerequisites:
-                if prereq not in completed_skills and prereq not in visited:
-                    queue.append((prereq, path + [self.get_node_by_id(current_skill)]))
+            if len(back_frontier) <= len(fwd_frontier):
+                next_frontier = set()
+                for skill in back_frontier:
+                    for prereq in self.get_prerequisites(skill):
+                        if prereq not in completed_skills and prereq not in back_parent:
+                            back_parent[prereq] = skill
+                            next_frontier.add(prereq)
+                back_frontier = next_frontier
+            else:
+                next_frontier = set()
+                for skill in fwd_frontier:
+                    for dependent in self.adjacency_list.get(skill, []):
+                        if dependent not in completed_skills and dependent not in fwd_parent:
+                            fwd_parent[dependent] = skill
+                            next_frontier.add(dependent)
+                fwd_frontier = next_frontier
         
         return []
     
+    def get_skill_tree_lean(self, completed_skills: Set[str]) -> Dict[str, Any]:
+        """Skill tree with per-node id and flags only.
+
+        Renderers that just need ids plus completed/available/centrality
+        should prefer this over get_skill_tree - four small keys per node
+        instead of a full copy of every title/description string.
+        """
+        completed_mask = self._mask(completed_skills)
+        nodes = [
+            {
+                'id': skill_id,
+                'completed': skill_id in completed_skills,
+                'available': self.prereq_mask[skill_id] & ~completed_mask == 0,
+                'centrality': self.centrality[skill_id]
+            }
+            for skill_id in self.topo_order
+        ]
+        
+        return {
+            'nodes': nodes,
+            'edges': self.edges,
+            'completed': list(completed_skills)
+        }
+    
     def get_skill_tree(self, completed_skills: Set[str]) -> Dict[str, Any]:
         """Get the complete skill tree with completion status"""
-        tree = {
-            'nodes': [],
+        # Overlay the per-user flags on the precomputed template; one
+        # completed mask answers every availability test with a bit AND
+        completed_mask = self._mask(completed_skills)
+        nodes = [
+            dict(template,
+                 completed=template['id'] in completed_skills,
+                 available=self.prereq_mask[template['id']] & ~completed_mask == 0)
+            for template in self._tree_template
+        ]
+        
+        return {
+            'nodes': nodes,
             'edges': self.edges,
             'completed': list(completed_skills)
         }
-        
-        for node in self.nodes:
-            node_data = {
-                **node,
-                'completed': node['id'] in completed_skills,
-                'available': self.is_available(node['id'], completed_skills),
-                'centrality': self.calculate_centrality(node['id'])
-            }
-            tree['nodes'].append(node_data)
-        
-        return tree
     
     def get_skill_stats(self, user_id: str) -> Dict[str, Any]:
         """Get statistics about the user's skill progress"""
         # Get completed skills
-        completed_quests = safe_query("""
-            SELECT q.id, q.title, q.difficulty
-            FROM quest_progress qp
-            JOIN quest q ON qp.quest_id = q.id
-            WHERE qp.user_id = ? AND qp.completed_at IS NOT NULL
-        """, (user_id,))
+        # One grouped query: per-difficulty counts with the completed ids
+        # packed alongside, instead of one transferred row per completion
+        completed_rows = safe_query(self._SQL_COMPLETED_BY_DIFFICULTY, (user_id,))
         
-        completed_skills = {row['id'] for row in completed_quests}
+        completed_skills = set()
+        difficulty_counts = {1: 0, 2: 0, 3: 0}
+        for row in completed_rows:
+            if row['difficulty'] in difficulty_counts:
+                difficulty_counts[row['difficulty']] = row['count']
+            completed_skills.update(row['quest_ids'].split(','))
         
         # Calculate statistics
         total_skills = len(self.nodes)
@@ -371,15 +540,9 @@ class IndieGraph:
         available_skills = self.get_available_skills(completed_skills)
         available_count = len(available_skills)
         
-        # Skills by difficulty
-        difficulty_counts = {1: 0, 2: 0, 3: 0}
-        for quest in completed_quests:
-            difficulty = quest['difficulty']
-            if difficulty in difficulty_counts:
-                difficulty_counts[difficulty] += 1
-        
-        # Next milestones
-        next_skills = self.get_next_skills(user_id, 3)
+        # Next milestones - rank from the completed set we already fetched
+        # rather than re-querying it through get_next_skills
+        next_skills = self.recommend_from_completed(completed_skills, 3)
         
         return {
             'total_skills': total_skills,
@@ -391,14 +554,10 @@ class IndieGraph:
         }
     
     def search_skills(self, query: str) -> List[Dict[str, Any]]:
-        """Search skills by title or description"""
+        """Search skills by title, description, or category"""
         query_lower = query.lower()
-        results = []
-        
-        for node in self.nodes:
-            if (query_lower in node['title'].lower() or 
-                query_lower in node['description'].lower() or
-                query_lower in node['category'].lower()):
-                results.append(node)
         
-        return results 
\ No newline at end of file
+        return [
+            node for node, fields in self._search_index
+            if any(query_lower in field for field in fields)
+        ] 
\ No newline at end of file
@@ -10,108 +10,132 @@ from .utils import generate_id
 
 class QuestManager:
     """Manages life skills quests and user progress"""
-    
+
+    # Constant SQL text so sqlite3's per-connection statement cache can
+    # reuse the compiled statements on these hot paths
+    _SQL_PROGRESS_ROW = """
+        SELECT id, completed_at FROM quest_progress
+        WHERE user_id = ? AND quest_id = ?
+    """
+    _SQL_START_QUEST = """
+        INSERT INTO quest_progress (id, user_id, quest_id, started_at)
+        SELECT ?, ?, ?, ?
+        WHERE EXISTS (SELECT 1 FROM quest WHERE id = ?)
+          AND NOT EXISTS (
+              SELECT 1 FROM quest_progress WHERE user_id = ? AND quest_id = ?
+          )
+    """
+    _SQL_MARK_COMPLETED = """
+        UPDATE quest_progress
+        SET completed_at = ?
+        WHERE user_id = ? AND quest_id = ? AND completed_at IS NULL
+    """
+    _SQL_QUESTS_BY_DIFFICULTY = """
+        SELECT id, title, description, difficulty, xp, est_minutes, materials
+        FROM quest
+        WHERE (? IS NULL OR difficulty = ?)
+        ORDER BY difficulty, title
+    """
+    _SQL_COMPLETED_IDS = """
+        SELECT quest_id FROM quest_progress
+        WHERE user_id = ? AND completed_at IS NOT NULL
+    """
+    _SQL_COMPLETED_TOTALS = """
+        SELECT COUNT(*) as count, COALESCE(SUM(q.xp), 0) as total_xp
+        FROM quest_progress qp
+        JOIN quest q ON qp.quest_id = q.id
+        WHERE qp.user_id = ? AND qp.completed_at IS NOT NULL
+    """
+    _SQL_RECENT_COMPLETIONS = """
+        SELECT 
+            q.title, q.xp, qp.completed_at
+        FROM quest_progress qp
+        JOIN quest q ON qp.quest_id = q.id
+        WHERE qp.user_id = ? AND qp.completed_at IS NOT NULL
+        ORDER BY qp.completed_at DESC
+        LIMIT ?
+    """
+
     def __init__(self):
         self.difficulty_names = {
             1: "Beginner",
             2: "Intermediate", 
             3: "Advanced"
         }
+        # Quest catalog cache: the quest table is static after seeding, so
+        # read it once on first use (lazy, since the manager may be built
+        # before the database is seeded) instead of once per call
+        self._all_quests: Optional[List[Dict[str, Any]]] = None
+        self._quests_by_id: Dict[str, Dict[str, Any]] = {}
+    
+    def _catalog(self) -> List[Dict[str, Any]]:
+        """Load and cache the quest catalog on first access"""
+        if self._all_quests is None:
+            quests = safe_query(self._SQL_QUESTS_BY_DIFFICULTY, (None, None))
+            for quest in quests:
+                quest['difficulty_name'] = self.difficulty_names.get(quest['difficulty'], 'Unknown')
+            self._all_quests = quests
+            self._quests_by_id = {quest['id']: quest for quest in quests}
+        
+        return self._all_quests
     
     def get_all_quests(self) -> List[Dict[str, Any]]:
         """Get all available quests"""
-        quests = safe_query("""
-            SELECT id, title, description, difficulty, xp, est_minutes, materials
-            FROM quest
-            ORDER BY difficulty, title
-        """)
-        
-        # Add difficulty name
-        for quest in quests:
-            quest['difficulty_name'] = self.difficulty_names.get(quest['difficulty'], 'Unknown')
-        
-        return quests
+        return self.get_quests()
+
+    def get_quests(self, difficulty: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get quests, optionally filtered by difficulty"""
+        # Copies keep callers free to annotate rows without touching the cache
+        return [
+            dict(quest) for quest in self._catalog()
+            if difficulty is None or quest['difficulty'] == difficulty
+        ]
     
     def get_quest_by_id(self, quest_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific quest by ID"""
-        quests = safe_query("""
-            SELECT id, title, description, difficulty, xp, est_minutes, materials
-            FROM quest
-            WHERE id = ?
-        """, (quest_id,))
-        
-        if not quests:
-            return None
+        self._catalog()
+        quest = self._quests_by_id.get(quest_id)
         
-        quest = quests[0]
-        quest['difficulty_name'] = self.difficulty_names.get(quest['difficulty'], 'Unknown')
-        return quest
+        return dict(quest) if quest else None
     
     def start_quest(self, user_id: str, quest_id: str) -> bool:
         """Start a quest for a user"""
-        # Check if quest exists
-        quest = self.get_quest_by_id(quest_id)
-        if not quest:
-            return False
-        
-        # Check if already started
-        existing = safe_query("""
-            SELECT id FROM quest_progress
-            WHERE user_id = ? AND quest_id = ?
-        """, (user_id, quest_id))
-        
-        if existing:
-            return False  # Already started
-        
-        # Start the quest
-        safe_execute("""
-            INSERT INTO quest_progress (id, user_id, quest_id, started_at)
-            VALUES (?, ?, ?, ?)
-        """, (generate_id(), user_id, quest_id, datetime.now().isoformat()))
-        
-        return True
+        # One atomic statement: the EXISTS guards fold the quest-exists
+        # and not-already-started checks into the INSERT itself, so this
+        # is a single round trip and race-free
+        inserted = safe_execute(self._SQL_START_QUEST, (
+            generate_id(), user_id, quest_id, datetime.now().isoformat(),
+            quest_id, user_id, quest_id
+        ))
+        
+        return inserted > 0
     
     def complete_quest(self, user_id: str, quest_id: str) -> bool:
         """Complete a quest for a user"""
-        # Check if quest exists and is started
-        progress = safe_query("""
-            SELECT id, completed_at FROM quest_progress
-            WHERE user_id = ? AND quest_id = ?
-        """, (user_id, quest_id))
+        # The completed_at IS NULL guard makes the UPDATE a no-op when the
+        # quest was never started or is already done; rowcount tells which
+        updated = safe_execute(self._SQL_MARK_COMPLETED, (datetime.now().isoformat(), user_id, quest_id))
         
-        if not progress:
-            return False  # Not started
-        
-        if progress[0]['completed_at']:
-            return False  # Already completed
-        
-        # Mark as completed
-        safe_execute("""
-            UPDATE quest_progress
-            SET completed_at = ?
-            WHERE user_id = ? AND quest_id = ?
-        """, (datetime.now().isoformat(), user_id, quest_id))
-        
-        return True
+        return updated > 0
     
     def is_quest_completed(self, user_id: str, quest_id: str) -> bool:
         """Check if a quest is completed by the user"""
-        result = safe_query("""
-            SELECT completed_at FROM quest_progress
-            WHERE user_id = ? AND quest_id = ?
-        """, (user_id, quest_id))
+        result = safe_query(self._SQL_PROGRESS_ROW, (user_id, quest_id))
         
         return bool(result and result[0]['completed_at'])
     
     def is_quest_started(self, user_id: str, quest_id: str) -> bool:
         """Check if a quest is started by the user"""
-        result = safe_query("""
-            SELECT id FROM quest_progress
-            WHERE user_id = ? AND quest_id = ?
-        """, (user_id, quest_id))
+        result = safe_query(self._SQL_PROGRESS_ROW, (user_id, quest_id))
         
         return bool(result)
     
+    def get_completed_quest_ids(self, user_id: str) -> frozenset:
+        """Get the IDs of all completed quests as a set for O(1) lookups"""
+        result = safe_query(self._SQL_COMPLETED_IDS, (user_id,))
+
+        return frozenset(row['quest_id'] for row in result)
+
     def get_completed_quests(self, user_id: str) -> List[Dict[str, Any]]:
         """Get all completed quests for a user"""
         completed = safe_query("""
@@ -148,38 +172,46 @@ class QuestManager:
         
         return started
     
+    def get_progress_summary(self, user_id: str) -> Dict[str, Any]:
+        """Completed count, total XP, and the last three completions.
+
+        Returns the scalars straight from SQL instead of materializing every
+        completed quest row just to count and sum it in Python.
+        """
+        totals = safe_query(self._SQL_COMPLETED_TOTALS, (user_id,))
+
+        return {
+            'completed_count': totals[0]['count'] if totals else 0,
+            'total_xp': totals[0]['total_xp'] if totals else 0,
+            'recent': self.get_recent_completions(user_id, limit=3)
+        }
+
     def get_quest_progress(self, user_id: str) -> Dict[str, Any]:
-        """Get overall quest progress for a user"""
-        total_quests = safe_query("SELECT COUNT(*) as count FROM quest")
-        total_quests = total_quests[0]['count'] if total_quests else 0
-        
-        completed_quests = safe_query("""
-            SELECT COUNT(*) as count
-            FROM quest_progress
-            WHERE user_id = ? AND completed_at IS NOT NULL
-        """, (user_id,))
-        completed_quests = completed_quests[0]['count'] if completed_quests else 0
-        
-        started_quests = safe_query("""
-            SELECT COUNT(*) as count
-            FROM quest_progress
-            WHERE user_id = ?
-        """, (user_id,))
-        started_quests = started_quests[0]['count'] if started_quests else 0
-        
-        total_xp = safe_query("""
-            SELECT COALESCE(SUM(q.xp), 0) as total_xp
+        """Get overall quest progress for a user.
+
+        One pass over the user's progress rows plus a scalar subselect for
+        the catalog size, instead of four separate COUNT/SUM queries.
+        """
+        rows = safe_query("""
+            SELECT
+                (SELECT COUNT(*) FROM quest) as total_quests,
+                COUNT(*) as started_quests,
+                COALESCE(SUM(qp.completed_at IS NOT NULL), 0) as completed_quests,
+                COALESCE(SUM(CASE WHEN qp.completed_at IS NOT NULL THEN q.xp END), 0) as total_xp
             FROM quest_progress qp
             JOIN quest q ON qp.quest_id = q.id
-            WHERE qp.user_id = ? AND qp.completed_at IS NOT NULL
+            WHERE qp.user_id = ?
         """, (user_id,))
-        total_xp = total_xp[0]['total_xp'] if total_xp else 0
+        
+        row = rows[0] if rows else {}
+        total_quests = row.get('total_quests', 0)
+        completed_quests = row.get('completed_quests', 0)
         
         return {
             'total_quests': total_quests,
             'completed_quests': completed_quests,
-            'started_quests': started_quests,
-            'total_xp': total_xp,
+            'started_quests': row.get('started_quests', 0),
+            'total_xp': row.get('total_xp', 0),
             'completion_rate': (completed_quests / total_quests * 100) if total_quests > 0 else 0
         }
     
@@ -204,36 +236,28 @@ class QuestManager:
     
     def get_recent_completions(self, user_id: str, limit: int = 5) -> List[Dict[str, Any]]:
         """Get recent quest completions"""
-        recent = safe_query("""
-            SELECT 
-                q.title, q.xp, qp.completed_at
-            FROM quest_progress qp
-            JOIN quest q ON qp.quest_id = q.id
-            WHERE qp.user_id = ? AND qp.completed_at IS NOT NULL
-            ORDER BY qp.completed_at DESC
-            LIMIT ?
-        """, (user_id, limit))
+        recent = safe_query(self._SQL_RECENT_COMPLETIONS, (user_id, limit))
         
         return recent
     
     def get_quest_recommendations(self, user_id: str, limit: int = 3) -> List[Dict[str, Any]]:
         """Get quest recommendations based on user's current level"""
-        # Get user's completed quests and their difficulties
-        completed = safe_query("""
-            SELECT q.difficulty
+        # Average the completed difficulties in SQL - no per-row transfer
+        # just to compute a mean. AVG returns NULL with no completions.
+        avg_row = safe_query("""
+            SELECT AVG(q.difficulty) as avg_difficulty
             FROM quest_progress qp
             JOIN quest q ON qp.quest_id = q.id
             WHERE qp.user_id = ? AND qp.completed_at IS NOT NULL
         """, (user_id,))
+        avg_difficulty = avg_row[0]['avg_difficulty'] if avg_row else None
         
-        if not completed:
+        if avg_difficulty is None:
             # New user - recommend beginner quests
             return self.get_quests_by_difficulty(user_id, 1)[:limit]
         
-        # Calculate average difficulty of completed quests
-        avg_difficulty = sum(q['difficulty'] for q in completed) / len(completed)
-        
-        # Recommend quests at or slightly above current level
+        # Recommend quests at or slightly above current level. The clamp
+        # stays in Python so round() keeps its half-to-even behavior.
         target_difficulty = min(3, max(1, round(avg_difficulty + 0.5)))
         
         # Get quests at target difficulty that aren't completed
@@ -242,7 +266,7 @@ class QuestManager:
                 q.id, q.title, q.description, q.difficulty, q.xp, q.est_minutes
             FROM quest q
             LEFT JOIN quest_progress qp ON q.id = qp.quest_id AND qp.user_id = ?
-            WHERE q.difficulty = ? AND (qp.completed_at IS NULL OR qp.completed_at IS NULL)
+            WHERE q.difficulty = ? AND qp.completed_at IS NULL
             ORDER BY q.xp DESC
             LIMIT ?
         """, (user_id, target_difficulty, limit))
@@ -3,147 +3,216 @@ Utils module for IndiePilot
 Helper functions for IDs, dates, validation, and export/import
 """
 
+import re
+import sqlite3
 import uuid
-import json
+import orjson
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict, List, Any, Optional
-from .db import safe_query, safe_execute
+from .db import safe_query, shared_connection, transaction
+
+# Compiled once at import; compiling (or re.cache-probing) per call is
+# pure overhead for patterns that never change
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# Deletion table for sanitize_input: one C-level pass over the string
+# instead of one full copy per dangerous character
+_SANITIZE_TABLE = str.maketrans({c: None for c in '<>"\'&;(){}'})
+
+# Bound once; skips the module attribute lookup on every id
+_uuid4 = uuid.uuid4
 
 def generate_id() -> str:
     """Generate a unique ID for database records"""
-    return str(uuid.uuid4())
+    return str(_uuid4())
+
+def _short_id() -> str:
+    """Eight hex chars for generated share codes; .hex skips the dash
+    formatting str(uuid) pays only to have the slice throw it away."""
+    return _uuid4().hex[:8]
 
 def format_datetime(dt: datetime) -> str:
     """Format datetime for display"""
     return dt.strftime('%Y-%m-%d %H:%M:%S')
 
+# Imports and exports see the same timestamp strings over and over
+# (backfills, bulk data); datetime is immutable so the parsed objects
+# can be shared. The now() fallback stays outside the cache so bad
+# input never pins a stale "now".
+@lru_cache(maxsize=4096)
+def _parse_iso(dt_str: str) -> datetime:
+    return datetime.fromisoformat(dt_str)
+
 def parse_datetime(dt_str: str) -> datetime:
     """Parse datetime string"""
+    # Python 3.11+ fromisoformat accepts the trailing 'Z' directly, so no
+    # per-call replace() copy is needed
     try:
-        return datetime.fromisoformat(dt_str.replace('Z', '+00:00'))
-    except:
+        return _parse_iso(dt_str)
+    except (ValueError, TypeError):
         return datetime.now()
 
 def validate_email(email: str) -> bool:
     """Basic email validation"""
-    import re
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
+    return bool(_EMAIL_RE.match(email))
 
 def validate_phone(phone: str) -> bool:
     """Basic phone number validation"""
-    import re
-    # Remove all non-digit characters
-    digits = re.sub(r'\D', '', phone)
-    return len(digits) >= 10
+    # Count digits in one C-level pass; no regex engine and no
+    # stripped-copy allocation
+    return sum(map(str.isdigit, phone)) >= 10
 
 def sanitize_input(text: str) -> str:
     """Sanitize user input to prevent injection"""
     if not text:
         return ""
-    
+
     # Remove potentially dangerous characters
-    dangerous_chars = ['<', '>', '"', "'", '&', ';', '(', ')', '{', '}']
-    for char in dangerous_chars:
-        text = text.replace(char, '')
-    
-    return text.strip()
+    return text.translate(_SANITIZE_TABLE).strip()
 
 def truncate_text(text: str, max_length: int = 100) -> str:
     """Truncate text to specified length"""
-    if len(text) <= max_length:
-        return text
-    return text[:max_length-3] + "..."
+    return text if len(text) <= max_length else text[:max_length - 3] + "..."
+
+def make_truncator(max_length: int):
+    """Return a truncate_text specialized for a fixed max_length.
+
+    The cutoff is computed once here instead of on every call, for
+    loops that truncate thousands of rows to the same width.
+    """
+    cutoff = max_length - 3
+
+    def truncate(text: str) -> str:
+        return text if len(text) <= max_length else text[:cutoff] + "..."
+
+    return truncate
 
 def calculate_age(birth_date: datetime) -> int:
     """Calculate age from birth date"""
     today = datetime.now()
-    age = today.year - birth_date.year
-    if today.month < birth_date.month or (today.month == birth_date.month and today.day < birth_date.day):
-        age -= 1
-    return age
+    # Tuple comparison yields the 0/1 "birthday not yet reached"
+    # correction in one C-level op, replacing the chained conditional
+    return today.year - birth_date.year - (
+        (today.month, today.day) < (birth_date.month, birth_date.day)
+    )
+
+# Bound format methods skip re-parsing the format spec per call in
+# dashboard loops that format whole columns
+_CURRENCY_FMT = "${:.2f}".format
+_PERCENT_FMT = "{:.1f}%".format
 
 def format_currency(amount: float) -> str:
     """Format amount as currency"""
-    return f"${amount:.2f}"
+    return _CURRENCY_FMT(amount)
 
 def format_percentage(value: float, total: float) -> str:
     """Format value as percentage of total"""
     if total == 0:
         return "0%"
-    percentage = (value / total) * 100
-    return f"{percentage:.1f}%"
+    return _PERCENT_FMT(value / total * 100)
 
-def export_data(user_id: str) -> Dict[str, Any]:
-    """
-    Export user data as JSON for portability.
-    Includes all user data except sensitive information.
-    """
-    export_data = {
-        'export_date': datetime.now().isoformat(),
-        'user_id': user_id,
-        'version': '1.0'
-    }
-    
-    # Export budget data
-    budget_logs = safe_query("""
+# Each export section is aggregated into one JSON array inside SQLite
+# (C-level json_object/json_group_array), so Python receives a single
+# blob per table instead of building one dict per row
+_SQL_EXPORT_BUDGET = """
+    SELECT json_group_array(json_object(
+        'ts', ts, 'amount', amount, 'jar', jar, 'note', note
+    )) FROM (
         SELECT ts, amount, jar, note
         FROM budget_log
         WHERE user_id = ?
         ORDER BY ts
-    """, (user_id,))
-    
-    export_data['budget'] = {
-        'transactions': [dict(log) for log in budget_logs]
-    }
-    
-    # Export quest progress
-    quest_progress = safe_query("""
+    )
+"""
+
+_SQL_EXPORT_QUESTS = """
+    SELECT json_group_array(json_object(
+        'quest_id', quest_id, 'started_at', started_at, 'completed_at', completed_at,
+        'title', title, 'description', description, 'difficulty', difficulty, 'xp', xp
+    )) FROM (
         SELECT qp.quest_id, qp.started_at, qp.completed_at,
                q.title, q.description, q.difficulty, q.xp
         FROM quest_progress qp
         JOIN quest q ON qp.quest_id = q.id
         WHERE qp.user_id = ?
         ORDER BY qp.started_at
-    """, (user_id,))
-    
-    export_data['quests'] = {
-        'progress': [dict(progress) for progress in quest_progress]
-    }
-    
-    # Export board activity
-    board_posts = safe_query("""
+    )
+"""
+
+_SQL_EXPORT_POSTS = """
+    SELECT json_group_array(json_object(
+        'kind', kind, 'title', title, 'detail', detail,
+        'share_code', share_code, 'created_at', created_at, 'status', status
+    )) FROM (
         SELECT kind, title, detail, share_code, created_at, status
         FROM board_post
         WHERE user_id = ?
         ORDER BY created_at
-    """, (user_id,))
-    
-    board_claims = safe_query("""
+    )
+"""
+
+_SQL_EXPORT_CLAIMS = """
+    SELECT json_group_array(json_object(
+        'claimed_at', claimed_at, 'kind', kind, 'title', title, 'share_code', share_code
+    )) FROM (
         SELECT bc.claimed_at, bp.kind, bp.title, bp.share_code
         FROM board_claim bc
         JOIN board_post bp ON bc.post_id = bp.id
         WHERE bc.user_id = ?
         ORDER BY bc.claimed_at
-    """, (user_id,))
-    
-    export_data['board'] = {
-        'posts': [dict(post) for post in board_posts],
-        'claims': [dict(claim) for claim in board_claims]
-    }
-    
-    # Export simulation runs
-    sim_runs = safe_query("""
+    )
+"""
+
+_SQL_EXPORT_RUNS = """
+    SELECT json_group_array(json_object(
+        'scenario_id', scenario_id, 'score', score, 'breakdown', breakdown, 'ran_at', ran_at
+    )) FROM (
         SELECT scenario_id, score, breakdown, ran_at
         FROM sim_run
         WHERE user_id = ?
         ORDER BY ran_at
-    """, (user_id,))
-    
+    )
+"""
+
+def _export_rows(sql: str, user_id: str) -> List[Dict[str, Any]]:
+    """Run one json_group_array export query and decode its single blob"""
+    rows = safe_query(sql, (user_id,))
+    blob = next(iter(rows[0].values())) if rows else None
+    return orjson.loads(blob) if blob else []
+
+def export_data(user_id: str) -> Dict[str, Any]:
+    """
+    Export user data as JSON for portability.
+    Includes all user data except sensitive information.
+
+    Row-to-dict conversion happens inside SQLite's JSON1 functions; each
+    section arrives as one pre-built JSON array decoded in a single
+    orjson pass instead of one Python dict per row.
+    """
+    export_data = {
+        'export_date': datetime.now().isoformat(),
+        'user_id': user_id,
+        'version': '1.0'
+    }
+
+    export_data['budget'] = {
+        'transactions': _export_rows(_SQL_EXPORT_BUDGET, user_id)
+    }
+
+    export_data['quests'] = {
+        'progress': _export_rows(_SQL_EXPORT_QUESTS, user_id)
+    }
+
+    export_data['board'] = {
+        'posts': _export_rows(_SQL_EXPORT_POSTS, user_id),
+        'claims': _export_rows(_SQL_EXPORT_CLAIMS, user_id)
+    }
+
     export_data['simulations'] = {
-        'runs': [dict(run) for run in sim_runs]
+        'runs': _export_rows(_SQL_EXPORT_RUNS, user_id)
     }
-    
+
     # Export user settings
     user_settings = safe_query("""
         SELECT spend_ratio, save_ratio, share_ratio,
@@ -151,12 +220,36 @@ def export_data(user_id: str) -> Dict[str, Any]:
         FROM user_settings
         WHERE user_id = ?
     """, (user_id,))
-    
+
     if user_settings:
-        export_data['settings'] = dict(user_settings[0])
-    
+        export_data['settings'] = user_settings[0]
+
     return export_data
 
+# Hoisted so every import reuses byte-identical SQL text; the shared
+# connection's statement cache then skips re-parsing these per call
+_SQL_INSERT_PROGRESS = """
+    INSERT INTO quest_progress (id, user_id, quest_id, started_at, completed_at)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+_SQL_INSERT_POST = """
+    INSERT INTO board_post (id, user_id, kind, title, detail, share_code, created_at, status)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_INSERT_RUN = """
+    INSERT INTO sim_run (id, user_id, scenario_id, score, breakdown, ran_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_UPSERT_SETTINGS = """
+    INSERT OR REPLACE INTO user_settings
+    (user_id, spend_ratio, save_ratio, share_ratio,
+     skills_weight, budgeting_weight, community_weight, judgment_weight)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
 def import_data(user_id: str, data: Dict[str, Any]) -> bool:
     """
     Import user data from JSON export.
@@ -166,181 +259,192 @@ def import_data(user_id: str, data: Dict[str, Any]) -> bool:
         # Validate export format
         if not isinstance(data, dict) or 'version' not in data:
             raise ValueError("Invalid export format")
+
+        # One timestamp per import; rows missing a date all fall back to
+        # the moment the import started instead of paying now() per row
+        now_iso = datetime.now().isoformat()
         
-        # Import budget data
+        # Import budget data in one batched transaction. This writes
+        # through a local BudgetManager; the app clears its own managers'
+        # caches after a successful import.
         if 'budget' in data and 'transactions' in data['budget']:
-            for transaction in data['budget']['transactions']:
-                safe_execute("""
-                    INSERT INTO budget_log (id, user_id, ts, amount, jar, note)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (
-                    generate_id(), user_id,
-                    transaction.get('ts', datetime.now().isoformat()),
-                    transaction.get('amount', 0),
-                    transaction.get('jar', 'spend'),
-                    transaction.get('note', 'Imported transaction')
-                ))
-        
-        # Import quest progress
-        if 'quests' in data and 'progress' in data['quests']:
-            for progress in data['quests']['progress']:
-                # Check if quest exists
-                quest_exists = safe_query("SELECT id FROM quest WHERE id = ?", (progress.get('quest_id'),))
-                if quest_exists:
-                    safe_execute("""
-                        INSERT INTO quest_progress (id, user_id, quest_id, started_at, completed_at)
-                        VALUES (?, ?, ?, ?, ?)
-                    """, (
-                        generate_id(), user_id,
+            from .budget import BudgetManager
+            BudgetManager().add_many_transactions(user_id, [
+                {
+                    'ts': entry.get('ts', now_iso),
+                    'amount': entry.get('amount', 0),
+                    'jar': entry.get('jar', 'spend'),
+                    'note': entry.get('note', 'Imported transaction')
+                }
+                for entry in data['budget']['transactions']
+            ])
+
+        # Local binding: the row comprehensions below resolve this once
+        # per import instead of one global lookup per row
+        _gen = generate_id
+
+        # The remaining tables share one BEGIN/COMMIT: a single fsync for
+        # the whole import, and a failure rolls them back together
+        with transaction() as conn:
+            # Import quest progress in one executemany batch, validating
+            # quest ids against a set loaded once instead of one SELECT
+            # per row. Only the ids the import references are fetched, so
+            # the prefetch stays proportional to the payload rather than
+            # the catalog.
+            if 'quests' in data and 'progress' in data['quests']:
+                wanted = {p.get('quest_id') for p in data['quests']['progress'] if p.get('quest_id')}
+                known_quests = {
+                    row['id'] for row in conn.execute(
+                        f"SELECT id FROM quest WHERE id IN ({','.join('?' * len(wanted))})",
+                        tuple(wanted)
+                    )
+                } if wanted else set()
+                conn.executemany(_SQL_INSERT_PROGRESS, [
+                    (
+                        _gen(), user_id,
                         progress.get('quest_id'),
-                        progress.get('started_at', datetime.now().isoformat()),
+                        progress.get('started_at', now_iso),
                         progress.get('completed_at')
-                    ))
-        
-        # Import board posts
-        if 'board' in data and 'posts' in data['board']:
-            for post in data['board']['posts']:
-                safe_execute("""
-                    INSERT INTO board_post (id, user_id, kind, title, detail, share_code, created_at, status)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    generate_id(), user_id,
-                    post.get('kind', 'study'),
-                    post.get('title', 'Imported post'),
-                    post.get('detail', ''),
-                    post.get('share_code', f"IMP-{generate_id()[:8]}"),
-                    post.get('created_at', datetime.now().isoformat()),
-                    post.get('status', 'available')
-                ))
-        
-        # Import simulation runs
-        if 'simulations' in data and 'runs' in data['simulations']:
-            for run in data['simulations']['runs']:
-                safe_execute("""
-                    INSERT INTO sim_run (id, user_id, scenario_id, score, breakdown, ran_at)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (
-                    generate_id(), user_id,
-                    run.get('scenario_id', 'unknown'),
-                    run.get('score', 50),
-                    run.get('breakdown', '{}'),
-                    run.get('ran_at', datetime.now().isoformat())
+                    )
+                    for progress in data['quests']['progress']
+                    if progress.get('quest_id') in known_quests
+                ])
+
+            # Import board posts
+            if 'board' in data and 'posts' in data['board']:
+                conn.executemany(_SQL_INSERT_POST, [
+                    (
+                        _gen(), user_id,
+                        post.get('kind', 'study'),
+                        post.get('title', 'Imported post'),
+                        post.get('detail', ''),
+                        post.get('share_code', f"IMP-{_short_id()}"),
+                        post.get('created_at', now_iso),
+                        post.get('status', 'available')
+                    )
+                    for post in data['board']['posts']
+                ])
+
+            # Import simulation runs
+            if 'simulations' in data and 'runs' in data['simulations']:
+                conn.executemany(_SQL_INSERT_RUN, [
+                    (
+                        _gen(), user_id,
+                        run.get('scenario_id', 'unknown'),
+                        run.get('score', 50),
+                        run.get('breakdown', '{}'),
+                        run.get('ran_at', now_iso)
+                    )
+                    for run in data['simulations']['runs']
+                ])
+
+            # Import user settings
+            if 'settings' in data:
+                settings = data['settings']
+                conn.execute(_SQL_UPSERT_SETTINGS, (
+                    user_id,
+                    settings.get('spend_ratio', 60.0),
+                    settings.get('save_ratio', 30.0),
+                    settings.get('share_ratio', 10.0),
+                    settings.get('skills_weight', 0.30),
+                    settings.get('budgeting_weight', 0.30),
+                    settings.get('community_weight', 0.15),
+                    settings.get('judgment_weight', 0.25)
                 ))
-        
-        # Import user settings
-        if 'settings' in data:
-            settings = data['settings']
-            safe_execute("""
-                INSERT OR REPLACE INTO user_settings 
-                (user_id, spend_ratio, save_ratio, share_ratio,
-                 skills_weight, budgeting_weight, community_weight, judgment_weight)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                user_id,
-                settings.get('spend_ratio', 60.0),
-                settings.get('save_ratio', 30.0),
-                settings.get('share_ratio', 10.0),
-                settings.get('skills_weight', 0.30),
-                settings.get('budgeting_weight', 0.30),
-                settings.get('community_weight', 0.15),
-                settings.get('judgment_weight', 0.25)
-            ))
-        
+
         return True
-        
-    except Exception as e:
+
+    # Anything the payload or the inserts can legitimately raise; a bare
+    # Exception here would also swallow programming errors
+    except (sqlite3.Error, KeyError, TypeError, ValueError) as e:
         print(f"Import failed: {str(e)}")
         return False
 
+# Declarative structure checks for validate_export_data: one flat pass
+# over (section, list key, messages) instead of nested branch ladders
+_REQUIRED_EXPORT_FIELDS = ('version', 'user_id', 'export_date')
+_EXPORT_SECTIONS = (
+    ('budget', 'transactions', "Budget data must be a dictionary", "Budget transactions must be a list"),
+    ('quests', 'progress', "Quest data must be a dictionary", "Quest progress must be a list"),
+)
+
 def validate_export_data(data: Dict[str, Any]) -> List[str]:
     """Validate export data structure and return list of errors"""
     errors = []
-    
-    if not isinstance(data, dict):
+
+    # Exports come from json/orjson loads, so exact-type checks are
+    # enough and skip isinstance's subclass walk
+    if type(data) is not dict:
         errors.append("Data must be a dictionary")
         return errors
-    
-    required_fields = ['version', 'user_id', 'export_date']
-    for field in required_fields:
-        if field not in data:
-            errors.append(f"Missing required field: {field}")
-    
+
+    errors.extend(
+        f"Missing required field: {field}"
+        for field in _REQUIRED_EXPORT_FIELDS if field not in data
+    )
+
     if 'version' in data and data['version'] != '1.0':
         errors.append("Unsupported export version")
-    
-    # Validate budget data
-    if 'budget' in data:
-        if not isinstance(data['budget'], dict):
-            errors.append("Budget data must be a dictionary")
-        elif 'transactions' in data['budget']:
-            if not isinstance(data['budget']['transactions'], list):
-                errors.append("Budget transactions must be a list")
-    
-    # Validate quest data
-    if 'quests' in data:
-        if not isinstance(data['quests'], dict):
-            errors.append("Quest data must be a dictionary")
-        elif 'progress' in data['quests']:
-            if not isinstance(data['quests']['progress'], list):
-                errors.append("Quest progress must be a list")
-    
+
+    for key, list_key, dict_msg, list_msg in _EXPORT_SECTIONS:
+        if key not in data:
+            continue
+        section = data[key]
+        if type(section) is not dict:
+            errors.append(dict_msg)
+        elif list_key in section and type(section[list_key]) is not list:
+            errors.append(list_msg)
+
     return errors
 
+# All six export-preview counters in one round-trip; each scalar
+# subquery is an indexed per-user count
+_SQL_DATA_SUMMARY = """
+    SELECT
+        (SELECT COUNT(*) FROM budget_log WHERE user_id = ?) as budget_transactions,
+        (SELECT COUNT(*) FROM quest_progress WHERE user_id = ?) as quests_started,
+        (SELECT COUNT(*) FROM quest_progress
+         WHERE user_id = ? AND completed_at IS NOT NULL) as quests_completed,
+        (SELECT COUNT(*) FROM board_post WHERE user_id = ?) as board_posts,
+        (SELECT COUNT(*) FROM board_claim WHERE user_id = ?) as board_claims,
+        (SELECT COUNT(*) FROM sim_run WHERE user_id = ?) as simulation_runs
+"""
+
 def get_data_summary(user_id: str) -> Dict[str, Any]:
     """Get a summary of user's data for export preview"""
     summary = {
         'user_id': user_id,
         'export_date': datetime.now().isoformat()
     }
-    
-    # Budget summary
-    budget_count = safe_query("""
-        SELECT COUNT(*) as count FROM budget_log WHERE user_id = ?
-    """, (user_id,))
-    summary['budget_transactions'] = budget_count[0]['count'] if budget_count else 0
-    
-    # Quest summary
-    quest_count = safe_query("""
-        SELECT COUNT(*) as count FROM quest_progress WHERE user_id = ?
-    """, (user_id,))
-    summary['quests_started'] = quest_count[0]['count'] if quest_count else 0
-    
-    completed_count = safe_query("""
-        SELECT COUNT(*) as count FROM quest_progress 
-        WHERE user_id = ? AND completed_at IS NOT NULL
-    """, (user_id,))
-    summary['quests_completed'] = completed_count[0]['count'] if completed_count else 0
-    
-    # Board summary
-    posts_count = safe_query("""
-        SELECT COUNT(*) as count FROM board_post WHERE user_id = ?
-    """, (user_id,))
-    summary['board_posts'] = posts_count[0]['count'] if posts_count else 0
-    
-    claims_count = safe_query("""
-        SELECT COUNT(*) as count FROM board_claim WHERE user_id = ?
-    """, (user_id,))
-    summary['board_claims'] = claims_count[0]['count'] if claims_count else 0
-    
-    # Simulation summary
-    sim_count = safe_query("""
-        SELECT COUNT(*) as count FROM sim_run WHERE user_id = ?
-    """, (user_id,))
-    summary['simulation_runs'] = sim_count[0]['count'] if sim_count else 0
-    
+
+    counts = safe_query(_SQL_DATA_SUMMARY, (user_id,) * 6)
+    summary.update(dict(counts[0]) if counts else {
+        'budget_transactions': 0,
+        'quests_started': 0,
+        'quests_completed': 0,
+        'board_posts': 0,
+        'board_claims': 0,
+        'simulation_runs': 0
+    })
+
     return summary
 
 def backup_database() -> str:
     """Create a backup of the database (simplified for demo)"""
-    import shutil
-    from pathlib import Path
-    
     backup_path = f"backup_indiepilot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
-    
+
+    # SQLite's online backup API copies pages natively and gives a
+    # consistent snapshot even mid-write; a file copy of an open WAL
+    # database can capture torn pages
     try:
-        shutil.copy2("indiepilot.db", backup_path)
+        with shared_connection() as conn:
+            dest = sqlite3.connect(backup_path)
+            try:
+                conn.backup(dest)
+            finally:
+                dest.close()
         return backup_path
-    except Exception as e:
+    except (sqlite3.Error, OSError) as e:
         print(f"Backup failed: {str(e)}")
         return ""
 
@@ -351,6 +455,6 @@ def restore_database(backup_path: str) -> bool:
     try:
         shutil.copy2(backup_path, "indiepilot.db")
         return True
-    except Exception as e:
+    except (OSError, shutil.Error) as e:
         print(f"Restore failed: {str(e)}")
         return False 
\ No newline at end of file